@@ -1,6 +1,7 @@
 from flask import Blueprint
 from flask_restx import Api
 
+from src.main.views.admin_routing import api as admin_ns
 from src.main.views.auth_routing import api as auth_ns
 from src.main.views.post_routing import api as post_ns
 from src.main.views.user_routing import api as user_ns
@@ -25,3 +26,4 @@ api = Api(blueprint,
 api.add_namespace(user_ns, path='/user')
 api.add_namespace(auth_ns, path='/auth')
 api.add_namespace(post_ns, path='/post')
+api.add_namespace(admin_ns, path='/admin')
@@ -1,11 +1,15 @@
 import os
 
 from flask import Flask
-from flask_cors import CORS
 
-from api import blueprint as blueprint_v1
 import config
-from extensions import db, migrate, cache, bcrypt
+from extensions import (
+    db, cache, bcrypt, hasher, pool_metrics, principal_cache, request_metrics, prometheus_metrics, slow_query_log
+)
+
+# No app is built at import time: `flask` finds create_app itself, and the production
+# server builds it through wsgi.py. The blueprint, CLI commands and migration support
+# are imported inside the factory so that importing models or extensions stays cheap.
 
 def create_app():
     flask_app = Flask(__name__)
@@ -13,19 +17,41 @@ def create_app():
     flask_app.config.from_object(config.config_map[environment])
     register_extensions(flask_app)
     register_blueprints(flask_app)
+    register_commands(flask_app)
     return flask_app
 
 def register_extensions(flask_app: Flask):
+    from flask_cors import CORS
+    # Flask-Migrate pulls in alembic, which only `flask db` needs
+    from flask_migrate import Migrate
+
     db.init_app(flask_app)
+    pool_metrics.init_app(flask_app, db)
+    slow_query_log.init_app(flask_app, db)
     cache.init_app(flask_app)
-    migrate.init_app(flask_app, db)
+    request_metrics.init_app(flask_app, db)
+    Migrate(flask_app, db)
     bcrypt.init_app(flask_app)
+    hasher.init_app(flask_app)
+    prometheus_metrics.init_app(flask_app, pool_metrics, hasher)
+    principal_cache.init_app(flask_app, 'PRINCIPAL_CACHE')
     CORS(flask_app)
 
 def register_blueprints(flask_app: Flask):
+    from api import blueprint as blueprint_v1
     flask_app.register_blueprint(blueprint_v1)
 
-app = create_app()
+def register_commands(flask_app: Flask):
+    from commands import user_cli
+    flask_app.cli.add_command(user_cli)
+
+def reset_after_fork(flask_app: Flask):
+    '''Run in each pre-forked worker: drop pooled connections inherited from the parent
+    without closing them, since the parent and the other workers hold the same sockets'''
+    with flask_app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    pool_metrics.reset()
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    create_app().run(debug=True)
@@ -0,0 +1,19 @@
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import create_app
+from extensions import db
+from src.main.views.asgi_routing import AsgiApp
+
+def create_asgi_app() -> AsgiApp:
+    '''Optional asyncio serving mode for the read-heavy post endpoints,
+    run with: uvicorn --factory asgi:create_asgi_app'''
+    # The Flask app is only built for its configuration and extensions, it serves nothing here
+    flask_app = create_app()
+    with flask_app.app_context():
+        url = db.engine.url
+    driver = flask_app.config['ASYNC_DATABASE_DRIVERS'][url.get_backend_name()]
+    options = dict(flask_app.config['SQLALCHEMY_ENGINE_OPTIONS'])
+    # Async engines need an asyncio-aware pool
+    options.pop('poolclass', None)
+    engine = create_async_engine(url.set(drivername=driver), **options)
+    return AsgiApp(engine, flask_app.config['SECRET_KEY'])
@@ -0,0 +1,72 @@
+'''Micro-benchmark of loading posts for a list response: ORM instances through the
+session, against a Core select mapped to PostView. Reports time and memory held per
+batch of rows. Run from the repository root:
+
+    python benchmarks/read_models.py --rows 10000
+'''
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from extensions import db
+from src.main.constants import STATUS_LIVE
+from src.main.models.post import Post
+from src.main.models.post_view import PostView
+from src.main.models.user import User  # Post.author resolves it by name
+
+def seed(engine, count: int):
+    db.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(insert(Post), [{
+            'title': 'Post number {}'.format(number),
+            'author_id': number % 50 + 1,
+            'content': 'Benchmark content {} '.format(number) * 20,
+            'status': STATUS_LIVE
+        } for number in range(count)])
+        session.commit()
+
+def load_orm(engine):
+    with Session(engine) as session:
+        posts = session.query(Post).filter(Post.status == STATUS_LIVE).order_by(Post.created_at, Post.id).all()
+        # Kept alive with the session, like a request would
+        return posts, session
+
+def load_views(engine):
+    with Session(engine) as session:
+        query = PostView.select().filter(Post.status == STATUS_LIVE).order_by(Post.created_at, Post.id)
+        return PostView.from_rows(session.execute(query)), session
+
+def held_memory(load, engine) -> int:
+    tracemalloc.start()
+    result = load(engine)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine('sqlite://')
+    seed(engine, args.rows)
+    cases = {'ORM instances': load_orm, 'Core + PostView': load_views}
+
+    print('{:<20}{:>12}{:>14}'.format('per {} rows'.format(args.rows), 'best ms', 'held KiB'))
+    for name, load in cases.items():
+        load(engine)
+        best = min(timeit.repeat(lambda: load(engine), number=1, repeat=args.repeat)) * 1000
+        print('{:<20}{:>12.1f}{:>14.0f}'.format(name, best, held_memory(load, engine) / 1024))
+
+if __name__ == '__main__':
+    main()
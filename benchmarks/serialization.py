@@ -0,0 +1,66 @@
+'''Micro-benchmark of post serialization: flask_restx marshal with json.dumps, as the
+app used to do, against the compiled serializers with orjson, per batch of rows.
+Run from the repository root:
+
+    python benchmarks/serialization.py --rows 10000
+'''
+import argparse
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from flask_restx import marshal
+
+from src.main.constants import STATUS_LIVE
+from src.main.models.post import Post
+from src.main.models.user import User  # Post.author resolves it by name
+from src.main.views.schemas import post_page_response, post_response
+from src.main.views.serializers import DICT, ROW, dumps, get_serializer
+
+def make_posts(count: int) -> list:
+    return [Post(
+        id=number,
+        author_id=number % 50,
+        title='Post number {}'.format(number),
+        content='Benchmark content {} '.format(number) * 20,
+        status=STATUS_LIVE
+    ) for number in range(1, count + 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    posts = make_posts(args.rows)
+    rows = [tuple(getattr(post, name) for name in get_serializer(post_response, source=ROW).columns) for post in posts]
+    page = {'posts': posts, 'next_cursor': None}
+    fields = ('id', 'title', 'excerpt')
+
+    cases = {
+        'marshal + json': lambda: json.dumps(
+            marshal(page, post_page_response),
+            separators=(',', ':')
+        ).encode('utf-8'),
+        'marshal + json, 3 fields': lambda: json.dumps(
+            marshal(page, post_page_response, mask='{posts{id,title,excerpt},next_cursor}'),
+            separators=(',', ':')
+        ).encode('utf-8'),
+        'compiled + orjson': lambda: dumps(get_serializer(post_page_response, None, DICT, 'posts')(page)),
+        'compiled + orjson, 3 fields': lambda: dumps(get_serializer(post_page_response, fields, DICT, 'posts')(page)),
+        'compiled rows + orjson': lambda: dumps([get_serializer(post_response, source=ROW)(row) for row in rows]),
+    }
+
+    print('{:<30}{:>14}{:>14}'.format('per {} rows'.format(args.rows), 'best ms', 'speedup'))
+    baseline = None
+    for name, case in cases.items():
+        best = min(timeit.repeat(case, number=1, repeat=args.repeat)) * 1000
+        baseline = baseline or best
+        print('{:<30}{:>14.1f}{:>13.1f}x'.format(name, best, baseline / best))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+'''Cold start budget: import time of the app's entry points, measured with -X importtime.
+
+Each scenario runs in a fresh interpreter, several times, and the median is compared
+with its budget. Some scenarios also list modules they must not import at all, which
+catches a heavy import creeping back into module scope regardless of machine speed.
+Run from the repository root:
+
+    python benchmarks/startup.py --check
+
+and with --top to see which imports dominate.
+'''
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name: (code, budget in ms, modules that must not be imported)
+SCENARIOS = {
+    # What models, migrations and most tests need
+    'extensions': (
+        'import extensions, src.main.models.post, src.main.models.user',
+        375,
+        ('alembic', 'flask_migrate', 'flask_restx', 'flask_cors', 'prometheus_client')
+    ),
+    # `import app` must not build anything
+    'app': (
+        'import app',
+        375,
+        ('alembic', 'flask_restx', 'api', 'prometheus_client')
+    ),
+    # A worker boot, or any `flask` command
+    'create_app': (
+        'from app import create_app; create_app()',
+        600,
+        ()
+    ),
+}
+
+def parse_importtime(stderr: str) -> dict:
+    '''Cumulative microseconds of each module imported, keyed by module name'''
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(cumulative), len(name) - len(name.lstrip()))
+    return modules
+
+def measure(code: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    return parse_importtime(result.stderr)
+
+def total_ms(modules: dict) -> float:
+    # Top level imports only, nested ones are already in their parents' cumulative time
+    top_level = min(depth for _, depth in modules.values())
+    return sum(cumulative for cumulative, depth in modules.values() if depth == top_level) / 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=0, help='Show the slowest imports of each scenario')
+    parser.add_argument('--check', action='store_true', help='Exit non-zero when a budget is exceeded')
+    args = parser.parse_args()
+
+    failures = []
+    print('{:<12}{:>12}{:>12}'.format('scenario', 'median ms', 'budget ms'))
+    for name, (code, budget, banned) in SCENARIOS.items():
+        runs = [measure(code) for _ in range(args.runs)]
+        median = statistics.median(total_ms(modules) for modules in runs)
+        print('{:<12}{:>12.1f}{:>12}'.format(name, median, budget))
+        if median > budget:
+            failures.append('{} took {:.1f} ms, over its {} ms budget'.format(name, median, budget))
+        for module in banned:
+            if module in runs[-1]:
+                failures.append('{} imported {}'.format(name, module))
+        if args.top:
+            slowest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+            for module, (cumulative, _) in slowest:
+                print('    {:<50}{:>10.1f}'.format(module, cumulative / 1000))
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    if args.check and failures:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+'''Side-by-side throughput of the read endpoints under the WSGI app and the ASGI app.
+
+Seeds a throwaway SQLite database, starts each server in turn on it, and drives both
+with the same concurrent keep-alive-free GET mix. Run from the repository root:
+
+    python benchmarks/throughput.py --concurrency 32 --duration 10
+
+The load generator shares the machine with the server, so compare the two modes
+against each other rather than reading the absolute numbers.
+'''
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SERVERS = {
+    'wsgi': ['-m', 'flask', '--app', 'app:create_app', 'run', '--no-debugger', '--no-reload', '--with-threads'],
+    'asgi': ['-m', 'uvicorn', '--factory', 'asgi:create_asgi_app', '--no-access-log', '--log-level', 'warning'],
+}
+
+def seed(users: int, posts_per_user: int):
+    from sqlalchemy import insert
+
+    from app import create_app
+    from extensions import db
+    from src.main.constants import STATUS_ACTIVE, STATUS_LIVE
+    from src.main.models.post import Post
+    from src.main.models.user import User
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        db.session.execute(insert(User.__table__), [{
+            'id': user_id,
+            'public_id': 'user-{}'.format(user_id),
+            'username': 'user{}'.format(user_id),
+            'email': 'user{}@bench.test'.format(user_id),
+            'status': STATUS_ACTIVE
+        } for user_id in range(1, users + 1)])
+        db.session.execute(insert(Post), [{
+            'title': 'Post {} by {}'.format(number, user_id),
+            'author_id': user_id,
+            'content': 'Benchmark content {} '.format(number) * 20,
+            'status': STATUS_LIVE
+        } for user_id in range(1, users + 1) for number in range(posts_per_user)])
+        db.session.commit()
+        post_ids = [post_id for post_id, in db.session.query(Post.id)]
+    return post_ids
+
+def make_paths(users: int, post_ids: list, count: int = 1000) -> list:
+    paths = []
+    for _ in range(count):
+        choice = random.random()
+        if choice < 0.4:
+            paths.append('/api/v1/post/{}'.format(random.choice(post_ids)))
+        elif choice < 0.7:
+            paths.append('/api/v1/post/?limit=20')
+        else:
+            paths.append('/api/v1/user/{}/posts?limit=20&fields=id,title,excerpt'.format(random.randint(1, users)))
+    return paths
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def wait_for(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('Server on port {} did not start'.format(port))
+
+async def fetch(port: int, path: str) -> int:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write('GET {} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n'.format(path).encode('ascii'))
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    return int(response.split(b' ', 2)[1])
+
+async def drive(port: int, paths: list, concurrency: int, duration: float):
+    latencies, errors = [], 0
+    deadline = time.monotonic() + duration
+
+    async def worker(offset: int):
+        nonlocal errors
+        index = offset
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                code = await fetch(port, paths[index % len(paths)])
+            except OSError:
+                code = None
+            if code not in (200, 204):
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+            index += concurrency
+
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return latencies, errors
+
+def run(mode: str, env: dict, paths: list, args) -> dict:
+    port = free_port()
+    command = [sys.executable, *SERVERS[mode], '--port', str(port)]
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(port)
+        # Warm up connections, caches and code paths before measuring
+        asyncio.run(drive(port, paths, args.concurrency, 1))
+        latencies, errors = asyncio.run(drive(port, paths, args.concurrency, args.duration))
+    finally:
+        server.terminate()
+        server.wait()
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / args.duration,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--posts-per-user', type=int, default=100)
+    parser.add_argument('--modes', nargs='+', default=list(SERVERS), choices=list(SERVERS))
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='blog-app-bench-')
+    os.environ['BLOG_APP_ENV'] = 'test'
+    os.environ['BLOG_APP_DATABASE_URI'] = 'sqlite:///{}'.format(os.path.join(directory, 'bench.db'))
+    post_ids = seed(args.users, args.posts_per_user)
+    paths = make_paths(args.users, post_ids)
+
+    print('{:<6}{:>10}{:>8}{:>10}{:>10}{:>10}'.format('mode', 'requests', 'errors', 'req/s', 'p50 ms', 'p99 ms'))
+    for mode in args.modes:
+        result = run(mode, dict(os.environ), paths, args)
+        print('{:<6}{requests:>10}{errors:>8}{rps:>10.1f}{p50_ms:>10.1f}{p99_ms:>10.1f}'.format(mode, **result))
+
+if __name__ == '__main__':
+    main()
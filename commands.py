@@ -0,0 +1,22 @@
+import click
+from flask.cli import AppGroup
+
+from src.main.controllers.user_controller import import_users, reconcile_post_counts
+
+user_cli = AppGroup('user', help='User administration.')
+
+@user_cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+def import_users_command(path: str):
+    '''Create users from a CSV file with username, email and password columns.'''
+    with open(path, encoding='utf-8', newline='') as csv_file:
+        result = import_users(csv_file)
+    for error in result['errors']:
+        click.echo('line {}: {}'.format(error['line'], error['errors']), err=True)
+    click.echo('{} users imported, {} rows rejected.'.format(result['imported'], result['failed']))
+
+@user_cli.command('reconcile-post-counts')
+def reconcile_post_counts_command():
+    '''Recompute post_count and live_post_count of every user from their posts.'''
+    updated = reconcile_post_counts()
+    click.echo('{} users corrected.'.format(updated))
@@ -1,9 +1,21 @@
 from flask_caching import Cache
-from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 
-db = SQLAlchemy()
-migrate = Migrate()
-cache = Cache(config={'CACHE_TYPE': 'SimpleCache'})
+from src.main.hashing import PasswordHasher
+from src.main.pool_metrics import PoolMetrics
+from src.main.prometheus_metrics import PrometheusMetrics
+from src.main.request_metrics import RequestMetrics
+from src.main.routing_session import RoutingSession
+from src.main.slow_query_log import SlowQueryLog
+from src.main.ttl_cache import TTLCache
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+cache = Cache()
 bcrypt = Bcrypt()
+hasher = PasswordHasher(bcrypt)
+principal_cache = TTLCache()
+pool_metrics = PoolMetrics()
+request_metrics = RequestMetrics()
+prometheus_metrics = PrometheusMetrics()
+slow_query_log = SlowQueryLog()
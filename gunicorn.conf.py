@@ -0,0 +1,42 @@
+# Production server settings, used with: gunicorn -c gunicorn.conf.py
+import glob
+import multiprocessing
+import os
+
+# Workers write their metrics to files here, so /metrics reports all of them. It must be
+# set, and emptied of a previous run's files, before the app and prometheus_client are loaded.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/blog-app-metrics')
+os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+for path in glob.glob(os.path.join(os.environ['PROMETHEUS_MULTIPROC_DIR'], '*.db')):
+    os.remove(path)
+
+wsgi_app = 'wsgi:app'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Import the app once in the master, so workers share its memory copy-on-write
+preload_app = True
+
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+# Replace each worker after this many requests, jittered so they do not all restart together
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# On SIGTERM, workers stop accepting and get this long to finish in-flight requests
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = 5
+
+accesslog = '-'
+
+def post_fork(server, worker):
+    from app import reset_after_fork
+    from wsgi import app
+    reset_after_fork(app)
+
+def child_exit(server, worker):
+    # Stop summing the gauges of a worker that is gone; its counters are kept
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
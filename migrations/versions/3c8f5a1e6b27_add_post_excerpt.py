@@ -0,0 +1,28 @@
+"""add post excerpt
+
+Revision ID: 3c8f5a1e6b27
+Revises: 9e41c0d7a2f3
+Create Date: 2026-10-18 13:40:52.917305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c8f5a1e6b27'
+down_revision = '9e41c0d7a2f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('excerpt', sa.String(length=200), nullable=True))
+
+    op.execute('UPDATE post SET excerpt = SUBSTR(content, 1, 200)')
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_column('excerpt')
@@ -0,0 +1,28 @@
+"""keyset pagination indexes
+
+Revision ID: 5b2d7e91c4a0
+Revises: cf28103c67ab
+Create Date: 2026-10-18 09:12:41.503217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2d7e91c4a0'
+down_revision = 'cf28103c67ab'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.create_index('ix_post_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_post_author_id_created_at_id', ['author_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_author_id_created_at_id')
+        batch_op.drop_index('ix_post_created_at_id')
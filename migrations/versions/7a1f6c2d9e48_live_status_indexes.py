@@ -0,0 +1,39 @@
+"""live status indexes
+
+Revision ID: 7a1f6c2d9e48
+Revises: d4a9b3e8f105
+Create Date: 2026-10-18 18:32:54.118306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a1f6c2d9e48'
+down_revision = 'd4a9b3e8f105'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Reads filter on status before paging on (created_at, id), so status leads the keyset indexes
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.create_index('ix_post_status_created_at_id', ['status', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_post_author_id_status_created_at_id', ['author_id', 'status', 'created_at', 'id'], unique=False)
+        batch_op.drop_index('ix_post_author_id_created_at_id')
+        batch_op.drop_index('ix_post_created_at_id')
+
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.create_index('ix_user_status_id', ['status', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_status_id')
+
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.create_index('ix_post_created_at_id', ['created_at', 'id'], unique=False)
+        batch_op.create_index('ix_post_author_id_created_at_id', ['author_id', 'created_at', 'id'], unique=False)
+        batch_op.drop_index('ix_post_author_id_status_created_at_id')
+        batch_op.drop_index('ix_post_status_created_at_id')
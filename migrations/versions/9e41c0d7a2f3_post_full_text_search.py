@@ -0,0 +1,33 @@
+"""post full text search
+
+Revision ID: 9e41c0d7a2f3
+Revises: 5b2d7e91c4a0
+Create Date: 2026-10-18 11:02:17.284910
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e41c0d7a2f3'
+down_revision = '5b2d7e91c4a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute('CREATE VIRTUAL TABLE post_fts USING fts5(title, content)')
+        op.execute('INSERT INTO post_fts (rowid, title, content) SELECT id, title, content FROM post')
+    elif dialect == 'mysql':
+        op.create_index('ix_post_fulltext', 'post', ['title', 'content'], mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute('DROP TABLE post_fts')
+    elif dialect == 'mysql':
+        op.drop_index('ix_post_fulltext', table_name='post')
@@ -0,0 +1,41 @@
+"""user post counts
+
+Revision ID: b5e03d7c2a61
+Revises: e2b7c4f81a93
+Create Date: 2026-10-18 19:40:27.914652
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e03d7c2a61'
+down_revision = 'e2b7c4f81a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('post_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('live_post_count', sa.Integer(), server_default='0', nullable=False))
+
+    user = sa.table('user', sa.column('id'), sa.column('post_count'), sa.column('live_post_count'))
+    post = sa.table('post', sa.column('id'), sa.column('author_id'), sa.column('status'))
+    op.execute(
+        user.update().values(
+            post_count=sa.select(sa.func.count(post.c.id))
+                .where(post.c.author_id == user.c.id)
+                .scalar_subquery(),
+            live_post_count=sa.select(sa.func.count(post.c.id))
+                .where(post.c.author_id == user.c.id, post.c.status == 'live')
+                .scalar_subquery()
+        )
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('live_post_count')
+        batch_op.drop_column('post_count')
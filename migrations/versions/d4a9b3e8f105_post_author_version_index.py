@@ -0,0 +1,26 @@
+"""post author version index
+
+Revision ID: d4a9b3e8f105
+Revises: 3c8f5a1e6b27
+Create Date: 2026-10-18 15:21:08.663041
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a9b3e8f105'
+down_revision = '3c8f5a1e6b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.create_index('ix_post_author_id_updated_at', ['author_id', 'updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_author_id_updated_at')
@@ -0,0 +1,26 @@
+"""post change feed index
+
+Revision ID: e2b7c4f81a93
+Revises: 7a1f6c2d9e48
+Create Date: 2026-10-18 19:04:12.530871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2b7c4f81a93'
+down_revision = '7a1f6c2d9e48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.create_index('ix_post_updated_at_id', ['updated_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_updated_at_id')
@@ -1,3 +1,13 @@
 STATUS_ACTIVE = 'active'
 STATUS_DELETED = 'deleted'
 STATUS_LIVE = 'live'
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+EXPORT_FORMAT_NDJSON = 'ndjson'
+EXPORT_BATCH_SIZE = 1000
+
+EXCERPT_LENGTH = 200
+
+POST_TITLE_LENGTH = 50
@@ -0,0 +1,12 @@
+from flask import abort
+
+from extensions import pool_metrics
+from logger import log
+
+def get_pool_stats_response():
+    try:
+        stats = pool_metrics.snapshot()
+    except Exception as e:
+        log.error('%s', e.args)
+        abort(500, 'An error occurred.')
+    return stats, 200
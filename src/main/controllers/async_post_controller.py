@@ -0,0 +1,132 @@
+from extensions import principal_cache
+from flask import abort
+from logger import log
+from sqlalchemy import select
+from werkzeug.exceptions import HTTPException
+
+from src.main.constants import DEFAULT_PAGE_SIZE
+from src.main.controllers.post_controller import (
+    check_include_deleted,
+    encode_page,
+    filter_live,
+    parse_fields
+)
+from src.main.models.post import Post
+from src.main.models.post_view import PostView
+from src.main.models.principal import Principal
+from src.main.models.user import User
+from src.main.pagination import clamp_limit, keyset_page_query, make_page
+from src.main.views.schemas import post_response
+from src.main.views.serializers import dumps, get_serializer
+
+# Async counterparts of the post_controller reads, for the ASGI app. Queries, filtering,
+# pagination and marshalling are shared with the WSGI app; only the awaits differ.
+
+# Database interactions
+async def get_principal_by_public_id(session, public_id: str) -> Principal:
+    # Without the Flask app there is no shared cache to check generations against, so
+    # entries are trusted until PRINCIPAL_CACHE_TTL; the WSGI lookup will not reuse them
+    entry = principal_cache.get(public_id)
+    if entry:
+        return entry[0]
+    user = (await session.scalars(select(User).filter_by(public_id=public_id))).first()
+    if not user:
+        return None
+    principal = Principal.from_user(user)
+    principal_cache.set(public_id, (principal, None))
+    return principal
+
+async def get_posts(
+        session,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str = None,
+        fields: tuple = None,
+        include_deleted: bool = False):
+    query = filter_live(PostView.select(fields), include_deleted)
+    return await paginate(session, query, limit, cursor)
+
+async def get_post_by_id(
+        session,
+        post_id: int,
+        fields: tuple = None,
+        include_deleted: bool = False) -> PostView:
+    query = filter_live(PostView.select(fields), include_deleted).filter_by(id=post_id)
+    row = (await session.execute(query)).first()
+    return PostView(*row) if row else None
+
+async def get_user_posts(
+        session,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str = None,
+        fields: tuple = None,
+        include_deleted: bool = False):
+    query = filter_live(PostView.select(fields).filter_by(author_id=user_id), include_deleted)
+    return await paginate(session, query, limit, cursor)
+
+async def paginate(session, query, limit: int, cursor: str = None):
+    limit = clamp_limit(limit)
+    rows = await session.execute(keyset_page_query(query, Post, limit, cursor))
+    return make_page(PostView.from_rows(rows), limit)
+
+def encode_post(post: PostView, fields: tuple) -> bytes:
+    return dumps(get_serializer(post_response, fields)(post))
+
+# Responses
+async def get_post_response(
+        session,
+        post_id: int,
+        fields: str = None,
+        include_deleted: bool = False,
+        current_user: Principal = None):
+    check_include_deleted(include_deleted, current_user)
+    fields = parse_fields(fields)
+    try:
+        post = await get_post_by_id(session, post_id, fields, include_deleted)
+    except Exception as e:
+        log.error('%s', e.args)
+        abort(500, 'An error occurred.')
+    if not post:
+        abort(404, 'Post not found.')
+    return encode_post(post, fields), 200
+
+async def get_posts_response(
+        session,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str = None,
+        fields: str = None,
+        include_deleted: bool = False,
+        current_user: Principal = None):
+    check_include_deleted(include_deleted, current_user)
+    fields = parse_fields(fields)
+    try:
+        posts, next_cursor = await get_posts(session, limit, cursor, fields, include_deleted)
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error('%s', e.args)
+        abort(500, 'An error occurred.')
+    if not posts:
+        return None, 204
+    return encode_page(posts, next_cursor, fields), 200
+
+async def get_user_posts_response(
+        session,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str = None,
+        fields: str = None,
+        include_deleted: bool = False,
+        current_user: Principal = None):
+    check_include_deleted(include_deleted, current_user)
+    fields = parse_fields(fields)
+    try:
+        posts, next_cursor = await get_user_posts(session, user_id, limit, cursor, fields, include_deleted)
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error('%s', e.args)
+        abort(500, 'An error occurred.')
+    if not posts:
+        return None, 204
+    return encode_page(posts, next_cursor, fields), 200
@@ -5,11 +5,23 @@ import json
 import jwt
 
 from logger import log
-from src.main.controllers.user_controller import create_user_response, get_user_by_email
+from src.main.controllers.user_controller import create_user_response, get_user_by_email, update_db
+from src.main.hashing import HashingPoolBusy
+from src.main.models.user import User
 
 def get_secret():
     return current_app.config['SECRET_KEY']
 
+def rehash_password(user: User, password: str):
+    '''Bring the stored hash up to the configured bcrypt cost while the password is at hand'''
+    if not user.needs_rehash():
+        return
+    try:
+        user.password_hash = password
+        update_db(user)
+    except Exception as e:
+        log.error('Unable to rehash password for user %s: %s', user.username, e.args)
+
 def login_user(auth: dict) -> Response:
     if not auth or not auth.get('email') or not auth.get('password'):
         abort(401, 'Login required.')
@@ -19,8 +31,13 @@ def login_user(auth: dict) -> Response:
     if not user:
         abort(401, 'User does not exist.')
 
-    if not user.authenticate(auth.get('password')):
+    try:
+        authenticated = user.authenticate(auth.get('password'))
+    except HashingPoolBusy:
+        abort(503, 'Server busy, try again later.')
+    if not authenticated:
         abort(403, 'Wrong password.')
+    rehash_password(user, auth.get('password'))
 
     token = jwt.encode({
         'public_id': user.public_id,
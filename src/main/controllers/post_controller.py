@@ -1,21 +1,74 @@
+import time
+from datetime import datetime, timedelta, timezone
 from extensions import db, cache
-from flask import abort
+from flask import abort, current_app, Response, stream_with_context
 from logger import log
+from sqlalchemy import bindparam, func, insert, select, text, update
 from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import HTTPException
 
-from src.main.models.post import Post
+from src.main.models.post import make_excerpt, Post
+from src.main.models.post_view import PostView
+from src.main.models.principal import Principal
 from src.main.models.user import User
-from src.main.constants import STATUS_LIVE, STATUS_DELETED
+from src.main.constants import (
+    DEFAULT_PAGE_SIZE,
+    EXPORT_BATCH_SIZE,
+    EXPORT_FORMAT_NDJSON,
+    STATUS_LIVE,
+    STATUS_DELETED
+)
+from src.main.pagination import (
+    clamp_limit,
+    decode_offset_cursor,
+    encode_keyset_cursor,
+    encode_offset_cursor,
+    keyset_page_query,
+    make_page,
+    paginate
+)
+from src.main.replicas import replica_reads
+from src.main.request_metrics import count_cache_lookup, memoized_lookup
+from src.main.search import index_post_rows, index_posts, reindex_post_ids, search_post_ids
+from src.main.views.schemas import (
+    post_batch_update_request,
+    post_page_response,
+    post_request,
+    post_response
+)
+from src.main.views.serializers import DICT, ROW, dumps, get_serializer
 
 # Database interactions
-def update_db(post: Post):
+def update_db(post: Post, post_count: int = 0, live_post_count: int = 0):
     db.session.add(post)
+    db.session.flush()
+    index_posts([post])
+    adjust_post_counts(post.author_id, post_count, live_post_count)
     db.session.commit()
 
 def update_attributes(post: Post, input: dict):
+    live_post_count = live_delta(post.status, input.get('status', post.status))
     for key, value in input.items():
         setattr(post, key, value)
-    update_db(post)
+    update_db(post, live_post_count=live_post_count)
+
+def live_delta(old_status: str, new_status: str) -> int:
+    return int(new_status == STATUS_LIVE) - int(old_status == STATUS_LIVE)
+
+def adjust_post_counts(author_id: int, post_count: int = 0, live_post_count: int = 0):
+    # Relative UPDATE, so concurrent writes by the same author cannot lose an increment
+    if not post_count and not live_post_count:
+        return
+    statement = (
+        update(User)
+        .where(User.id == author_id)
+        .values(
+            post_count=User.post_count + post_count,
+            live_post_count=User.live_post_count + live_post_count
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(statement)
 
 def create_post_from_dict(input: dict) :
     post = Post(
@@ -24,19 +77,279 @@ def create_post_from_dict(input: dict) :
         content = input['content'],
         status = STATUS_LIVE
     )
-    update_db(post)
+    update_db(post, post_count=1, live_post_count=1)
     log.info('Post %s created', post.title)
     return post
 
-def get_posts():
-    return Post.query.all()
+def create_posts_from_dicts(inputs: list, author_id: int) -> list:
+    '''Insert posts in one transaction, returning their ids in input order'''
+    rows = [{
+        'title': input['title'],
+        'author_id': author_id,
+        'content': input['content'],
+        'excerpt': make_excerpt(input['content']),
+        'status': STATUS_LIVE
+    } for input in inputs]
+    dialect = db.session.get_bind().dialect
+    if dialect.insert_executemany_returning:
+        statement = insert(Post).returning(Post.id, sort_by_parameter_order=True)
+        post_ids = db.session.execute(statement, rows).scalars().all()
+    elif dialect.name == 'mysql':
+        # A multi-row INSERT is a "simple insert": under every innodb_autoinc_lock_mode
+        # its rows get consecutive ids, and lastrowid is the first of them
+        first_id = db.session.execute(insert(Post).values(rows)).lastrowid
+        step = db.session.execute(text('SELECT @@auto_increment_increment')).scalar()
+        post_ids = [first_id + index * step for index in range(len(rows))]
+    else:
+        post_ids = [db.session.execute(insert(Post).values(row)).inserted_primary_key[0] for row in rows]
+    index_post_rows([dict(row, id=post_id) for row, post_id in zip(rows, post_ids)])
+    adjust_post_counts(author_id, len(rows), len(rows))
+    db.session.commit()
+    log.info('%s posts created for author %s', len(rows), author_id)
+    return post_ids
+
+def update_posts_from_dicts(inputs: list, author_id: int) -> list:
+    '''Apply per-post changes to the author's live posts, returning the ids actually updated.
+    Items changing the same columns share one executemany UPDATE, which checks the author and
+    status again, since either may have changed since the batch was authorized.'''
+    groups = {}
+    for input in inputs:
+        # Bound parameters may not share the names of the columns they set
+        row = {'b_' + name: value for name, value in input.items()}
+        if 'content' in input:
+            row['b_excerpt'] = make_excerpt(input['content'])
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    post = Post.__table__
+    updated = []
+    for names, rows in groups.items():
+        statement = (
+            update(post)
+            .where(post.c.id == bindparam('b_id'), post.c.author_id == author_id, post.c.status == STATUS_LIVE)
+            .values({name[2:]: bindparam(name) for name in names if name != 'b_id'})
+        )
+        if db.session.execute(statement, rows).rowcount == len(rows):
+            updated.extend(row['b_id'] for row in rows)
+            continue
+        # Some posts were deleted or changed hands meanwhile; applying the same values
+        # again one post at a time tells which
+        updated.extend(row['b_id'] for row in rows if db.session.execute(statement, row).rowcount)
+    reindex_post_ids(updated)
+    db.session.commit()
+    log.info('%s posts updated', len(updated))
+    return updated
+
+def delete_posts_by_ids(post_ids: list, author_id: int):
+    statement = (
+        update(Post)
+        .where(Post.id.in_(post_ids), Post.author_id == author_id, Post.status == STATUS_LIVE)
+        .values(status=STATUS_DELETED)
+        .execution_options(synchronize_session=False)
+    )
+    # Counted from the rows actually changed, in case some were deleted concurrently
+    deleted = db.session.execute(statement).rowcount
+    adjust_post_counts(author_id, live_post_count=-deleted)
+    db.session.commit()
+    log.info('%s posts deleted', deleted)
+
+def get_post_authors(post_ids: list) -> dict:
+    '''Author of each live post, fetched with a single IN query'''
+    statement = select(Post.id, Post.author_id).where(Post.id.in_(post_ids), Post.status == STATUS_LIVE)
+    rows = db.session.execute(statement)
+    return {row.id: row.author_id for row in rows}
+
+def parse_fields(fields: str) -> tuple:
+    if not fields:
+        return None
+    names = tuple(name.strip() for name in fields.split(','))
+    if not all(name in post_response for name in names):
+        abort(400, 'Unknown field requested.')
+    return names
+
+def filter_live(query, include_deleted: bool = False):
+    # Served by the (status, created_at, id) indexes; without the filter the query sorts
+    if include_deleted:
+        return query
+    return query.filter(Post.status == STATUS_LIVE)
+
+def get_posts(
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str = None,
+        fields: tuple = None,
+        include_deleted: bool = False):
+    query = filter_live(PostView.select(fields), include_deleted)
+    with replica_reads():
+        return paginate_views(query, limit, cursor)
 
 def get_post_by_id(post_id: int) -> Post:
-    return Post.query.filter_by(id=post_id).first()
+    # ORM instance for writes, always looked up on the primary
+    return filter_live(Post.query).filter_by(id=post_id).first()
+
+def get_post_view(post_id: int, fields: tuple = None, include_deleted: bool = False) -> PostView:
+    query = filter_live(PostView.select(fields), include_deleted).filter_by(id=post_id)
+    with replica_reads():
+        row = db.session.execute(query).first()
+    return PostView(*row) if row else None
+
+def get_user_posts(
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str = None,
+        fields: tuple = None,
+        include_deleted: bool = False):
+    generation = get_user_posts_generation(user_id)
+    # Sticky on the author too, so nobody caches a lagging page under the new generation
+    with replica_reads(user_id), memoized_lookup():
+        return get_user_posts_page(user_id, generation, limit, cursor, fields, include_deleted)
+
+@cache.memoize(60, cache_none=True)
+def get_user_posts_page(
+        user_id: int,
+        generation: int,
+        limit: int,
+        cursor: str,
+        fields: tuple,
+        include_deleted: bool = False) -> bytes:
+    # Cached as encoded JSON so a hit skips both the database and the marshaller
+    count_cache_lookup(False)
+    posts, next_cursor = fetch_user_posts(user_id, limit, cursor, fields, include_deleted)
+    if not posts:
+        return None
+    return encode_page(posts, next_cursor, fields)
+
+def fetch_user_posts(
+        user_id: int,
+        limit: int,
+        cursor: str,
+        fields: tuple,
+        include_deleted: bool = False):
+    query = filter_live(PostView.select(fields).filter_by(author_id=user_id), include_deleted)
+    return paginate_views(query, limit, cursor)
+
+def paginate_views(query, limit: int, cursor: str = None):
+    '''paginate for PostView selects: rows become slotted views instead of ORM instances'''
+    limit = clamp_limit(limit)
+    rows = db.session.execute(keyset_page_query(query, Post, limit, cursor))
+    return make_page(PostView.from_rows(rows), limit)
+
+def encode_page(posts: list, next_cursor: str, fields: tuple) -> bytes:
+    serialize = get_serializer(post_page_response, fields, DICT, items='posts')
+    return dumps(serialize({'posts': posts, 'next_cursor': next_cursor}))
+
+def user_posts_generation_key(user_id: int) -> str:
+    return 'user_posts_generation:{}'.format(user_id)
+
+def get_user_posts_generation(user_id: int) -> int:
+    key = user_posts_generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Evicted, or never set: start a new generation rather than fall back to one
+        # that pages may already be memoized under. add() keeps the first worker's.
+        cache.add(key, time.time_ns(), timeout=0)
+        generation = cache.get(key)
+    return generation
+
+def get_post_version(post_id: int, include_deleted: bool = False, current_user: Principal = None):
+    '''Cheap (version, last_modified) of a post the caller may see, or (None, None) when it
+    cannot be determined, so that the view answers with its usual 403 or 404'''
+    if include_deleted and not (current_user and current_user.admin):
+        return None, None
+    try:
+        # Same source as the body it describes
+        with replica_reads():
+            updated_at = (
+                filter_live(db.session.query(Post.updated_at), include_deleted)
+                .filter_by(id=post_id)
+                .scalar()
+            )
+    except Exception as e:
+        log.error('%s', e.args)
+        return None, None
+    if not updated_at:
+        return None, None
+    return '{}:{}'.format(post_id, updated_at.isoformat()), updated_at
+
+def get_user_posts_version(user_id: int, include_deleted: bool = False, current_user: Principal = None):
+    '''Aggregate (version, last_modified) over the posts of an author the caller may see'''
+    if include_deleted and not (current_user and current_user.admin):
+        return None, None
+    try:
+        with replica_reads(user_id):
+            count, updated_at = (
+                filter_live(db.session.query(func.count(Post.id), func.max(Post.updated_at)), include_deleted)
+                .filter_by(author_id=user_id)
+                .one()
+            )
+    except Exception as e:
+        log.error('%s', e.args)
+        return None, None
+    if not count:
+        return None, None
+    return '{}:{}:{}'.format(user_id, count, updated_at.isoformat()), updated_at
+
+def search_posts(query: str, limit: int = DEFAULT_PAGE_SIZE, cursor: str = None):
+    limit = clamp_limit(limit)
+    offset = decode_offset_cursor(cursor) if cursor else 0
+    post_ids = search_post_ids(query, limit + 1, offset)
+    next_cursor = encode_offset_cursor(offset + limit) if len(post_ids) > limit else None
+    post_ids = post_ids[:limit]
+    if not post_ids:
+        return [], next_cursor
+    rows = db.session.execute(PostView.select().filter(Post.id.in_(post_ids)))
+    posts = {post.id: post for post in PostView.from_rows(rows)}
+    return [posts[post_id] for post_id in post_ids if post_id in posts], next_cursor
+
+def get_post_changes(since: str = None, limit: int = DEFAULT_PAGE_SIZE, settle_seconds: int = 0):
+    '''Posts changed after the since token, oldest first, deleted ones included;
+    returns (rows, token to resume from, whether more rows are ready)'''
+    settled = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=settle_seconds)
+    query = db.session.query(
+        Post.id,
+        Post.author_id,
+        Post.title,
+        Post.content,
+        Post.excerpt,
+        Post.status,
+        Post.updated_at
+    ).filter(Post.updated_at <= settled)
+    rows, next_cursor = paginate(query, Post, limit, since, order_by='updated_at')
+    if not rows:
+        return [], since, False
+    return rows, encode_keyset_cursor(rows[-1].updated_at, rows[-1].id), next_cursor is not None
+
+def make_change(row) -> dict:
+    change = row._asdict()
+    change['deleted'] = row.status == STATUS_DELETED
+    if change['deleted']:
+        # Tombstones only tell consumers which post to drop
+        for key in ('title', 'content', 'excerpt'):
+            del change[key]
+    return change
+
+def stream_posts(batch_size: int = EXPORT_BATCH_SIZE, include_deleted: bool = False):
+    return db.session.execute(export_statement(batch_size, include_deleted))
+
+def export_statement(batch_size: int = EXPORT_BATCH_SIZE, include_deleted: bool = False):
+    # Columns in the order the row serializer reads them
+    columns = get_serializer(post_response, source=ROW).columns
+    statement = filter_live(select(*(getattr(Post, name) for name in columns)), include_deleted)
+    # Server-side cursor, fetched batch_size rows at a time, on drivers that support
+    # one (mysqldb, psycopg2); others, such as mysqlconnector, buffer the whole result
+    return statement.order_by(Post.id).execution_options(stream_results=True, yield_per=batch_size)
+
+def generate_ndjson(rows):
+    serialize = get_serializer(post_response, source=ROW)
+    try:
+        for partition in rows.partitions():
+            yield b''.join(dumps(serialize(row)) + b'\n' for row in partition)
+    except Exception as e:
+        log.error('Post export interrupted: %s', e.args)
+        raise
 
-@cache.memoize(60)
-def get_user_posts(user_id: int):
-    return Post.query.filter_by(author_id=user_id).all()
+def invalidate_user_posts(user_id: int):
+    # Cached pages are keyed by generation, so replacing it orphans all of them at once
+    # in every worker; the orphans simply expire. Generations are timestamps rather than
+    # counters: they never repeat, even once a key is lost, and need no atomic increment.
+    cache.set(user_posts_generation_key(user_id), time.time_ns(), timeout=0)
 
 # Responses
 def update_post(post: Post, input: dict):
@@ -54,7 +367,7 @@ def delete_post(post: Post):
     update_post(post, {'status': STATUS_DELETED})
     log.info('Post %s deleted', post.title)
 
-def create_post_response(post_input: dict, current_user: User):
+def create_post_response(post_input: dict, current_user: Principal):
     if not current_user:
         abort(401, 'Unauthorized.')
     try:
@@ -63,12 +376,22 @@ def create_post_response(post_input: dict, current_user: User):
     except Exception as e:
         log.error('%s', e.args)
         abort(500, 'An error occurred.')
-    cache.delete_memoized(get_user_posts, current_user.id)
+    invalidate_user_posts(current_user.id)
     return new_post, 201
     
-def get_post_response(post_id: int):
+def check_include_deleted(include_deleted: bool, current_user: Principal):
+    if include_deleted and not (current_user and current_user.admin):
+        abort(403, 'User is not an admin.')
+
+def get_post_response(
+        post_id: int,
+        fields: str = None,
+        include_deleted: bool = False,
+        current_user: Principal = None):
+    check_include_deleted(include_deleted, current_user)
+    fields = parse_fields(fields)
     try:
-        post = get_post_by_id(post_id)
+        post = get_post_view(post_id, fields, include_deleted)
     except Exception as e:
         log.error('%s', e.args)
         abort(500, 'An error occurred.')
@@ -76,27 +399,203 @@ def get_post_response(post_id: int):
         abort(404, 'Post not found.')
     return post, 200
 
-def get_posts_response():
+def get_posts_response(
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str = None,
+        fields: str = None,
+        include_deleted: bool = False,
+        current_user: Principal = None):
+    check_include_deleted(include_deleted, current_user)
+    fields = parse_fields(fields)
     try:
-        posts = get_posts()
+        posts, next_cursor = get_posts(limit, cursor, fields, include_deleted)
+    except HTTPException:
+        raise
     except Exception as e:
         log.error('%s', e.args)
         abort(500, 'An error occurred.')
     if not posts:
-        return [], 204
-    return posts, 200
+        return {'posts': [], 'next_cursor': None}, 204
+    return {'posts': posts, 'next_cursor': next_cursor}, 200
+
+def get_batch_max_size() -> int:
+    return current_app.config['POST_BATCH_MAX_SIZE']
+
+def get_changes_settle_seconds() -> int:
+    return current_app.config['POST_CHANGES_SETTLE_SECONDS']
+
+def validate_batch_item(model, item) -> dict:
+    try:
+        model.validate(item)
+    except HTTPException as e:
+        return getattr(e, 'data', {}).get('errors') or {'': e.description}
+    return None
+
+def check_batch_size(items: list):
+    if not isinstance(items, list) or not items:
+        abort(400, 'Expected a non-empty list of posts.')
+    if len(items) > get_batch_max_size():
+        abort(413, 'Too many posts in one batch.')
+
+def batch_response(results: list, succeeded: int, success_code: int):
+    results.sort(key=lambda result: result['index'])
+    if not succeeded:
+        return {'results': results}, 400
+    if succeeded < len(results):
+        return {'results': results}, 207
+    return {'results': results}, success_code
 
-def get_user_posts_response(user_id: int):
+def authorize_batch(items: list, current_user: Principal):
+    '''Split (index, post_id, item) targets into failed results and the ones current_user may change'''
     try:
-        posts = get_user_posts(user_id)
+        authors = get_post_authors([post_id for _, post_id, _ in items])
+    except Exception as e:
+        log.error('%s', e.args)
+        abort(500, 'An error occurred.')
+    results = []
+    allowed = []
+    seen = set()
+    for index, post_id, item in items:
+        if post_id in seen:
+            results.append({'index': index, 'id': post_id, 'status': 400, 'errors': {'id': 'Duplicate post id.'}})
+        elif post_id not in authors:
+            results.append({'index': index, 'id': post_id, 'status': 404, 'errors': {'id': 'Post not found.'}})
+        elif authors[post_id] != current_user.id:
+            results.append({'index': index, 'id': post_id, 'status': 401, 'errors': {'id': 'Unauthorized.'}})
+        else:
+            allowed.append((index, post_id, item))
+        seen.add(post_id)
+    return results, allowed
+
+def create_posts_response(post_inputs: list, current_user: Principal):
+    if not current_user:
+        abort(401, 'Unauthorized.')
+    check_batch_size(post_inputs)
+    results = []
+    valid_inputs = []
+    for index, post_input in enumerate(post_inputs):
+        errors = validate_batch_item(post_request, post_input)
+        if errors:
+            results.append({'index': index, 'status': 400, 'errors': errors})
+        else:
+            valid_inputs.append((index, post_input))
+    if valid_inputs:
+        try:
+            post_ids = create_posts_from_dicts([item for _, item in valid_inputs], current_user.id)
+        except Exception as e:
+            log.error('%s', e.args)
+            abort(500, 'An error occurred.')
+        invalidate_user_posts(current_user.id)
+        for (index, _), post_id in zip(valid_inputs, post_ids):
+            results.append({'index': index, 'id': post_id, 'status': 201})
+    return batch_response(results, len(valid_inputs), 201)
+
+def update_posts_response(post_inputs: list, current_user: Principal):
+    if not current_user:
+        abort(401, 'Unauthorized.')
+    check_batch_size(post_inputs)
+    results = []
+    targets = []
+    for index, post_input in enumerate(post_inputs):
+        errors = validate_batch_item(post_batch_update_request, post_input)
+        if not errors and len(post_input) < 2:
+            errors = {'': 'Nothing to update.'}
+        if errors:
+            post_id = post_input.get('id') if isinstance(post_input, dict) else None
+            results.append({'index': index, 'id': post_id, 'status': 400, 'errors': errors})
+        else:
+            targets.append((index, post_input['id'], post_input))
+    failed, allowed = authorize_batch(targets, current_user) if targets else ([], [])
+    results.extend(failed)
+    updated = set()
+    if allowed:
+        try:
+            updated = set(update_posts_from_dicts([item for _, _, item in allowed], current_user.id))
+        except Exception as e:
+            log.error('%s', e.args)
+            abort(500, 'An error occurred.')
+        invalidate_user_posts(current_user.id)
+    for index, post_id, _ in allowed:
+        if post_id in updated:
+            results.append({'index': index, 'id': post_id, 'status': 200})
+        else:
+            results.append({'index': index, 'id': post_id, 'status': 404, 'errors': {'id': 'Post not found.'}})
+    return batch_response(results, len(updated), 200)
+
+def delete_posts_response(delete_input: dict, current_user: Principal):
+    if not current_user:
+        abort(401, 'Unauthorized.')
+    post_ids = delete_input['ids']
+    check_batch_size(post_ids)
+    failed, allowed = authorize_batch([(index, post_id, None) for index, post_id in enumerate(post_ids)], current_user)
+    if allowed:
+        try:
+            delete_posts_by_ids([post_id for _, post_id, _ in allowed], current_user.id)
+        except Exception as e:
+            log.error('%s', e.args)
+            abort(500, 'An error occurred.')
+        invalidate_user_posts(current_user.id)
+    results = failed + [{'index': index, 'id': post_id, 'status': 204} for index, post_id, _ in allowed]
+    return batch_response(results, len(allowed), 200)
+
+def search_posts_response(search_input: dict):
+    try:
+        posts, next_cursor = search_posts(
+            search_input['query'],
+            search_input.get('limit'),
+            search_input.get('cursor')
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         log.error('%s', e.args)
         abort(500, 'An error occurred.')
     if not posts:
-        return [], 204
-    return posts, 200
+        return {'posts': [], 'next_cursor': None}, 204
+    return {'posts': posts, 'next_cursor': next_cursor}, 200
+
+def get_post_changes_response(since: str = None, limit: int = DEFAULT_PAGE_SIZE):
+    try:
+        rows, next_token, has_more = get_post_changes(since, limit, get_changes_settle_seconds())
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error('%s', e.args)
+        abort(500, 'An error occurred.')
+    changes = [make_change(row) for row in rows]
+    return {'changes': changes, 'next_token': next_token, 'has_more': has_more}, 200
+
+def export_posts_response(export_format: str = EXPORT_FORMAT_NDJSON, include_deleted: bool = False):
+    if export_format != EXPORT_FORMAT_NDJSON:
+        abort(400, 'Unsupported export format.')
+    try:
+        rows = stream_posts(include_deleted=include_deleted)
+    except Exception as e:
+        log.error('%s', e.args)
+        abort(500, 'An error occurred.')
+    return Response(stream_with_context(generate_ndjson(rows)), mimetype='application/x-ndjson')
+
+def get_user_posts_response(
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str = None,
+        fields: str = None,
+        include_deleted: bool = False,
+        current_user: Principal = None):
+    check_include_deleted(include_deleted, current_user)
+    fields = parse_fields(fields)
+    try:
+        payload = get_user_posts(user_id, limit, cursor, fields, include_deleted)
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.error('%s', e.args)
+        abort(500, 'An error occurred.')
+    if not payload:
+        return {'posts': [], 'next_cursor': None}, 204
+    return payload, 200
 
-def update_post_response(post_id: int, input: dict, current_user: User):
+def update_post_response(post_id: int, input: dict, current_user: Principal):
     try:
         post = get_post_by_id(post_id)
     except Exception as e:
@@ -107,10 +606,10 @@ def update_post_response(post_id: int, input: dict, current_user: User):
     if not current_user or current_user.id != post.author_id:
         abort(401, 'Unauthorized.')
     post = update_post(post, input)
-    cache.delete_memoized(get_user_posts, current_user.id)
+    invalidate_user_posts(current_user.id)
     return post, 201
  
-def delete_post_response(post_id: int, current_user: User):
+def delete_post_response(post_id: int, current_user: Principal):
     try:
         post = get_post_by_id(post_id)
     except Exception as e:
@@ -121,5 +620,5 @@ def delete_post_response(post_id: int, current_user: User):
     if not current_user or current_user.id != post.author_id:
         abort(401, 'Unauthorized.')
     delete_post(post)
-    cache.delete_memoized(get_user_posts, current_user.id)
+    invalidate_user_posts(current_user.id)
     return 'Post successfully deleted.', 204
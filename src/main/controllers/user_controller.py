@@ -1,10 +1,20 @@
-from extensions import db
-from flask import abort
+import csv
+import time
+
+from extensions import db, cache, principal_cache
+from flask import abort, current_app
+from sqlalchemy import func, or_, select, update
 from sqlalchemy.exc import IntegrityError
 
 from logger import log
+from src.main.hashing import HashingPoolBusy
+from src.main.models.post import Post
+from src.main.models.principal import Principal
 from src.main.models.user import User
-from src.main.constants import STATUS_ACTIVE, STATUS_DELETED
+from src.main.models.user_view import UserView
+from src.main.replicas import replica_reads
+from src.main.request_metrics import count_cache_lookup
+from src.main.constants import STATUS_ACTIVE, STATUS_DELETED, STATUS_LIVE
 
 # Database interactions
 def update_db(user: User):
@@ -28,18 +38,98 @@ def create_user_from_dict(input: dict) :
     log.info('User %s created', user.username)
     return user
 
-def get_users():
-    return User.query.all()
+def import_users(lines) -> dict:
+    config = current_app.config
+    # Imported here, the process pool machinery is only needed by imports
+    from src.main.user_import import UserImport
+    user_import = UserImport(
+        config['BCRYPT_LOG_ROUNDS'],
+        config['USER_IMPORT_CHUNK_SIZE'],
+        config['USER_IMPORT_WORKERS']
+    )
+    return user_import.run(lines)
+
+def reconcile_post_counts() -> int:
+    '''Rebuild every author's post counters from the post table in one statement;
+    returns how many users had drifted'''
+    post_count = select(func.count(Post.id)).where(Post.author_id == User.id).scalar_subquery()
+    live_post_count = (
+        select(func.count(Post.id))
+        .where(Post.author_id == User.id, Post.status == STATUS_LIVE)
+        .scalar_subquery()
+    )
+    statement = (
+        update(User)
+        .where(or_(User.post_count != post_count, User.live_post_count != live_post_count))
+        .values(post_count=post_count, live_post_count=live_post_count)
+        .execution_options(synchronize_session=False)
+    )
+    updated = db.session.execute(statement).rowcount
+    db.session.commit()
+    log.info('Post counts reconciled for %s users', updated)
+    return updated
+
+def filter_active(query, include_deleted: bool = False):
+    if include_deleted:
+        return query
+    return query.filter_by(status=STATUS_ACTIVE)
+
+def get_users(include_deleted: bool = False) -> list:
+    query = filter_active(UserView.select(), include_deleted)
+    with replica_reads():
+        return UserView.from_rows(db.session.execute(query.order_by(User.id)))
 
 def get_user_by_id(user_id: int) -> User:
     return User.query.filter_by(id=user_id).first()
 
+def get_user_view(user_id: int, include_deleted: bool = False) -> UserView:
+    query = filter_active(UserView.select(), include_deleted).filter_by(id=user_id)
+    # On the primary for a while after the user's own writes
+    with replica_reads(user_id):
+        row = db.session.execute(query).first()
+    return UserView(*row) if row else None
+
 def get_user_by_public_id(public_id: int) -> User:
     return User.query.filter_by(public_id=public_id).first()
 
 def get_user_by_email(email: str) -> User:
     return User.query.filter_by(email=email).first()
 
+def principal_generation_key(public_id: str) -> str:
+    return 'principal_generation:{}'.format(public_id)
+
+def get_principal_generation(public_id: str) -> int:
+    key = principal_generation_key(public_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Evicted, or never set: start a new generation, so that no worker keeps trusting
+        # a principal it cached under the lost one. add() keeps the first worker's.
+        cache.add(key, time.time_ns(), timeout=0)
+        generation = cache.get(key)
+    return generation
+
+def get_principal_by_public_id(public_id: str) -> Principal:
+    # Read before the user, so a change committed meanwhile leaves a stale entry behind
+    # a generation that no longer matches
+    generation = get_principal_generation(public_id)
+    entry = principal_cache.get(public_id)
+    hit = entry is not None and entry[1] == generation
+    count_cache_lookup(hit)
+    if hit:
+        return entry[0]
+    user = get_user_by_public_id(public_id)
+    if not user:
+        return None
+    principal = Principal.from_user(user)
+    principal_cache.set(public_id, (principal, generation))
+    return principal
+
+def invalidate_principal(public_id: str):
+    # The local entry goes at once; every other worker drops its copy on its next lookup,
+    # when the generation no longer matches
+    principal_cache.pop(public_id)
+    cache.set(principal_generation_key(public_id), time.time_ns(), timeout=0)
+
 # Responses
 def update_user(user: User, input: dict):
     try:
@@ -50,6 +140,8 @@ def update_user(user: User, input: dict):
     except Exception as e:
         log.error('%s', e.args)
         abort(500, 'An error occurred.')
+    finally:
+        invalidate_principal(user.public_id)
     return user
 
 def delete_user(user: User):
@@ -59,6 +151,8 @@ def delete_user(user: User):
 def create_user_response(user_input: dict):
     try:
         new_user = create_user_from_dict(user_input)
+    except HashingPoolBusy:
+        abort(503, 'Server busy, try again later.')
     except IntegrityError as e:
         log.error('%s', e.args)
         abort(409, 'Database conflict.')
@@ -66,10 +160,29 @@ def create_user_response(user_input: dict):
         log.error('%s', e.args)
         abort(500, 'An error occurred.')
     return new_user, 201
+
+def import_users_response(lines):
+    try:
+        result = import_users(lines)
+    except ValueError as e:
+        abort(400, str(e))
+    except csv.Error as e:
+        log.error('%s', e.args)
+        abort(400, 'Invalid CSV.')
+    except Exception as e:
+        log.error('%s', e.args)
+        abort(500, 'An error occurred.')
+    if not result['imported']:
+        if not result['failed']:
+            abort(400, 'No users to import.')
+        return result, 400
+    if result['failed']:
+        return result, 207
+    return result, 201
     
-def get_user_response(user_id: int):
+def get_user_response(user_id: int, include_deleted: bool = False):
     try:
-        user = get_user_by_id(user_id)
+        user = get_user_view(user_id, include_deleted)
     except Exception as e:
         log.error('%s', e.args)
         abort(500, 'An error occurred.')
@@ -77,9 +190,9 @@ def get_user_response(user_id: int):
         abort(404, 'User not found.')
     return user, 200
 
-def get_users_response():
+def get_users_response(include_deleted: bool = False):
     try:
-        users = get_users()
+        users = get_users(include_deleted)
     except Exception as e:
         log.error('%s', e.args)
         abort(500, 'An error occurred.')
@@ -87,7 +200,7 @@ def get_users_response():
         return [], 204
     return users, 200
 
-def update_user_response(user_id: int, input: dict, current_user: User):
+def update_user_response(user_id: int, input: dict, current_user: Principal):
     if not current_user or current_user.id != user_id:
         abort(401, 'Unauthorized.')
     try:
@@ -100,7 +213,7 @@ def update_user_response(user_id: int, input: dict, current_user: User):
     user = update_user(user, input)
     return user, 201
  
-def delete_user_response(user_id: int, current_user: User):
+def delete_user_response(user_id: int, current_user: Principal):
     if not current_user or current_user.id != user_id:
         abort(401, 'Unauthorized.')
     try:
@@ -0,0 +1,86 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from src.main.request_metrics import timed
+
+class HashingPoolBusy(Exception):
+    '''Raised when the password hashing queue is full'''
+
+def hash_password(password: str, log_rounds: int) -> str:
+    '''Plain bcrypt hash, importable by process pool workers without the app'''
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(log_rounds)).decode('utf-8')
+
+class PasswordHasher(object):
+    '''Runs bcrypt on a small dedicated thread pool, so a burst of logins or
+    signups cannot tie up every CPU and request thread of a worker.'''
+
+    def __init__(self, bcrypt, log_rounds: int = 12, pool_size: int = 2, max_pending: int = 16):
+        self.bcrypt = bcrypt
+        self.log_rounds = log_rounds
+        self.pool_size = pool_size
+        self.max_pending = max_pending
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+
+    def init_app(self, app):
+        self.shutdown()
+        self.log_rounds = app.config.get('BCRYPT_LOG_ROUNDS', self.log_rounds)
+        self.pool_size = app.config.get('BCRYPT_POOL_SIZE', self.pool_size)
+        self.max_pending = app.config.get('BCRYPT_POOL_MAX_PENDING', self.max_pending)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    @property
+    def queue_depth(self) -> int:
+        '''Hashing jobs submitted and not yet finished, running ones included'''
+        return self._pending
+
+    def hash(self, password: str) -> str:
+        password_hash = self._run(
+            self.bcrypt.generate_password_hash,
+            password.encode('utf-8'),
+            self.log_rounds
+        )
+        return password_hash.decode('utf-8')
+
+    def check(self, password_hash: str, password: str) -> bool:
+        return self._run(self.bcrypt.check_password_hash, password_hash, password.encode('utf-8'))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        # bcrypt hashes look like $2b$<cost>$<salt and digest>
+        try:
+            return int(password_hash.split('$')[2]) != self.log_rounds
+        except (AttributeError, IndexError, ValueError):
+            return False
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingPoolBusy('Password hashing queue is full.')
+        with self._lock:
+            self._pending += 1
+        try:
+            with timed('bcrypt'):
+                return self._get_executor().submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+            self._slots.release()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Created lazily so that pre-forked workers each start their own threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.pool_size,
+                    thread_name_prefix='bcrypt'
+                )
+            return self._executor
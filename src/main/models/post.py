@@ -1,10 +1,25 @@
 from datetime import datetime, timezone
 from extensions import db
+from sqlalchemy import DDL, event
+from sqlalchemy.orm import validates
+
+from src.main.constants import EXCERPT_LENGTH, POST_TITLE_LENGTH
+
+def make_excerpt(content: str) -> str:
+    if content is None:
+        return None
+    return content[:EXCERPT_LENGTH]
 
 class Post(db.Model):
     __tablename__ = 'post'
+    __table_args__ = (
+        db.Index('ix_post_status_created_at_id', 'status', 'created_at', 'id'),
+        db.Index('ix_post_author_id_status_created_at_id', 'author_id', 'status', 'created_at', 'id'),
+        db.Index('ix_post_author_id_updated_at', 'author_id', 'updated_at'),
+        db.Index('ix_post_updated_at_id', 'updated_at', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True, index=True)
-    title = db.Column(db.String(50), nullable=False)
+    title = db.Column(db.String(POST_TITLE_LENGTH), nullable=False)
     author_id = db.Column(
         db.Integer,
         db.ForeignKey('user.id', ondelete='CASCADE'),
@@ -17,7 +32,38 @@ class Post(db.Model):
     )
 
     content = db.Column(db.Text)
+    excerpt = db.Column(db.String(EXCERPT_LENGTH))
     status = db.Column(db.String(50))
 
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
-    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda:datetime.now(timezone.utc))
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda:datetime.now(timezone.utc),
+        onupdate=lambda:datetime.now(timezone.utc)
+    )
+
+    @validates('content')
+    def validate_content(self, key, content):
+        self.excerpt = make_excerpt(content)
+        return content
+
+# Full-text search over title and content. SQLite keeps a separate FTS5 table
+# that post_controller writes to; MySQL keeps a FULLTEXT index on the table.
+event.listen(
+    Post.__table__,
+    'after_create',
+    DDL('CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5(title, content)')
+        .execute_if(dialect='sqlite')
+)
+event.listen(
+    Post.__table__,
+    'after_create',
+    DDL('ALTER TABLE post ADD FULLTEXT INDEX ix_post_fulltext (title, content)')
+        .execute_if(dialect='mysql')
+)
+event.listen(
+    Post.__table__,
+    'before_drop',
+    DDL('DROP TABLE IF EXISTS post_fts').execute_if(dialect='sqlite')
+)
@@ -0,0 +1,34 @@
+from dataclasses import dataclass, fields as dataclass_fields
+from datetime import datetime
+
+from sqlalchemy import null, select
+
+from src.main.models.post import Post
+
+@dataclass(slots=True)
+class PostView:
+    '''A post as the read endpoints return it, built straight from a Core row:
+    no change tracking, no identity map entry, no per-instance __dict__'''
+    id: int
+    author_id: int
+    title: str
+    content: str
+    excerpt: str
+    status: str
+    created_at: datetime
+
+    @classmethod
+    def select(cls, fields: tuple = None):
+        '''Core select of this view's columns in order. Columns outside fields are
+        returned as NULL; id and created_at are always read, cursors are built from them.'''
+        wanted = {'id', 'created_at', *fields} if fields else None
+        return select(*(
+            getattr(Post, name) if wanted is None or name in wanted else null().label(name)
+            for name in COLUMNS
+        ))
+
+    @classmethod
+    def from_rows(cls, rows) -> list:
+        return [cls(*row) for row in rows]
+
+COLUMNS = tuple(field.name for field in dataclass_fields(PostView))
@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    '''What authentication needs to know about a user, without an ORM row attached'''
+    id: int
+    public_id: str
+    username: str
+    admin: bool
+    status: str
+
+    @classmethod
+    def from_user(cls, user) -> 'Principal':
+        return cls(
+            id=user.id,
+            public_id=user.public_id,
+            username=user.username,
+            admin=bool(user.admin),
+            status=user.status
+        )
@@ -1,11 +1,14 @@
 import uuid
-from extensions import db, bcrypt
+from extensions import db, hasher
 from datetime import datetime, timezone
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy_serializer import SerializerMixin
 
 class User(db.Model, SerializerMixin):
     __tablename__ = 'user'
+    __table_args__ = (
+        db.Index('ix_user_status_id', 'status', 'id'),
+    )
     id = db.Column(db.Integer, primary_key=True, index=True)
     public_id = db.Column(db.String(50), unique=True, default=lambda:str(uuid.uuid4()), index=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -13,8 +16,16 @@ class User(db.Model, SerializerMixin):
     email = db.Column(db.String(100), unique=True, nullable=False, index=True)
     admin = db.Column(db.Boolean)
     status = db.Column(db.String(20))
-    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
-    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now(timezone.utc))
+    # Maintained by post_controller in the same transaction as each post write
+    post_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    live_post_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    created_at = db.Column(db.DateTime, nullable=False, default=lambda:datetime.now(timezone.utc))
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=lambda:datetime.now(timezone.utc),
+        onupdate=lambda:datetime.now(timezone.utc)
+    )
 
     @hybrid_property
     def password_hash(self):
@@ -22,12 +33,12 @@ class User(db.Model, SerializerMixin):
 
     @password_hash.setter
     def password_hash(self, password: str):
-        password_hash = bcrypt.generate_password_hash(
-            password.encode('utf-8'))
-        self._password_hash = password_hash.decode('utf-8')
+        self._password_hash = hasher.hash(password)
     
     def authenticate(self, password):
-        return bcrypt.check_password_hash(
-            self._password_hash, password.encode('utf-8'))
+        return hasher.check(self._password_hash, password)
+
+    def needs_rehash(self):
+        return hasher.needs_rehash(self._password_hash)
     
     serialize_rules = ('-_password_hash', )
@@ -0,0 +1,24 @@
+from dataclasses import dataclass, fields as dataclass_fields
+
+from sqlalchemy import select
+
+from src.main.models.user import User
+
+@dataclass(slots=True)
+class UserView:
+    '''A user as the read endpoints return it, built straight from a Core row'''
+    id: int
+    username: str
+    email: str
+    post_count: int
+    live_post_count: int
+
+    @classmethod
+    def select(cls):
+        return select(*(getattr(User, name) for name in COLUMNS))
+
+    @classmethod
+    def from_rows(cls, rows) -> list:
+        return [cls(*row) for row in rows]
+
+COLUMNS = tuple(field.name for field in dataclass_fields(UserView))
@@ -0,0 +1,71 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from flask import abort
+from sqlalchemy import and_, or_
+
+from src.main.constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+
+def encode_cursor(values: list) -> str:
+    payload = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError):
+        abort(400, 'Invalid cursor.')
+    if not isinstance(values, list):
+        abort(400, 'Invalid cursor.')
+    return values
+
+def clamp_limit(limit: int) -> int:
+    if not limit:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def encode_keyset_cursor(position: datetime, row_id: int) -> str:
+    return encode_cursor([position.isoformat(), row_id])
+
+def decode_keyset_cursor(cursor: str):
+    values = decode_cursor(cursor)
+    try:
+        position, row_id = values
+        return datetime.fromisoformat(position), int(row_id)
+    except (TypeError, ValueError):
+        abort(400, 'Invalid cursor.')
+
+def encode_offset_cursor(offset: int) -> str:
+    return encode_cursor([offset])
+
+def decode_offset_cursor(cursor: str) -> int:
+    values = decode_cursor(cursor)
+    if len(values) != 1 or not isinstance(values[0], int) or values[0] < 0:
+        abort(400, 'Invalid cursor.')
+    return values[0]
+
+def paginate(query, model, limit: int, cursor: str = None, order_by: str = 'created_at'):
+    '''Keyset pagination ordered by (order_by, id); returns (items, next_cursor)'''
+    limit = clamp_limit(limit)
+    items = keyset_page_query(query, model, limit, cursor, order_by).all()
+    return make_page(items, limit, order_by)
+
+def keyset_page_query(query, model, limit: int, cursor: str = None, order_by: str = 'created_at'):
+    '''Restrict a Query or select() to one page, plus one row telling whether another page follows'''
+    column = getattr(model, order_by)
+    if cursor:
+        position, row_id = decode_keyset_cursor(cursor)
+        query = query.filter(or_(
+            column > position,
+            and_(column == position, model.id > row_id)
+        ))
+    return query.order_by(column, model.id).limit(limit + 1)
+
+def make_page(items: list, limit: int, order_by: str = 'created_at'):
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    return items, encode_keyset_cursor(getattr(items[-1], order_by), items[-1].id)
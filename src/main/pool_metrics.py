@@ -0,0 +1,139 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+class InstrumentedQueuePool(QueuePool):
+    '''QueuePool that reports how long each checkout waited, and which ones timed out.
+    Pool events fire only once a connection is handed out, so waits are timed here.'''
+
+    metrics = None
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting to the same place
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics:
+                self.metrics.record_timeout()
+            raise
+        finally:
+            if self.metrics:
+                self.metrics.record_wait(time.perf_counter() - start)
+
+# Name of the engine Flask-SQLAlchemy keys as None
+DEFAULT_BIND = 'default'
+
+class PoolMetrics(object):
+    '''Per-process connection pool counters of every engine of the app, by bind'''
+
+    def __init__(self):
+        self.binds = {}
+
+    def init_app(self, app, db):
+        self.binds = {}
+        with app.app_context():
+            for bind, engine in db.engines.items():
+                self.track(engine, bind or DEFAULT_BIND)
+
+    def track(self, engine, bind: str = DEFAULT_BIND):
+        self.binds[bind] = PoolStats(bind)
+        self.binds[bind].track(engine)
+        return self.binds[bind]
+
+    def reset(self):
+        for stats in self.binds.values():
+            stats.reset()
+
+    def snapshot(self) -> list:
+        return [stats.snapshot() for stats in self.binds.values()]
+
+class PoolStats(object):
+    '''Connection pool counters of one engine, fed by SQLAlchemy pool events'''
+
+    def __init__(self, bind: str = DEFAULT_BIND):
+        self.bind = bind
+        self._lock = threading.Lock()
+        self._engine = None
+        self.reset()
+
+    def track(self, engine):
+        self._engine = engine
+        if isinstance(engine.pool, InstrumentedQueuePool):
+            engine.pool.metrics = self
+        event.listen(engine, 'connect', self.on_connect)
+        event.listen(engine, 'checkout', self.on_checkout)
+        event.listen(engine, 'checkin', self.on_checkin)
+        event.listen(engine, 'invalidate', self.on_invalidate)
+
+    def reset(self):
+        with self._lock:
+            self.connects = 0
+            self.checkouts = 0
+            self.checkins = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.waits = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checkouts += 1
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception):
+        # Includes connections found stale by pool_pre_ping
+        with self._lock:
+            self.invalidations += 1
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        pool = self._engine.pool if self._engine else None
+        with self._lock:
+            stats = {
+                'bind': self.bind,
+                'connects': self.connects,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'invalidations': self.invalidations,
+                'timeouts': self.timeouts,
+                'wait_seconds_total': self.wait_seconds_total,
+                'wait_seconds_max': self.wait_seconds_max,
+                'wait_seconds_avg': self.wait_seconds_total / self.waits if self.waits else 0.0,
+            }
+        # Only QueuePool keeps a fixed size and an overflow
+        if isinstance(pool, QueuePool):
+            stats.update({
+                'size': pool.size(),
+                'checked_in': pool.checkedin(),
+                'checked_out': pool.checkedout(),
+                'overflow': max(pool.overflow(), 0),
+                'max_overflow': pool._max_overflow,
+                'timeout': pool.timeout(),
+            })
+        return stats
@@ -0,0 +1,109 @@
+import os
+import re
+import threading
+import time
+
+from flask import Response, g, request
+
+from src.main.request_metrics import current_timings
+
+# Namespace of a flask_restx route, e.g. user for /api/v1/user/<int:id>
+NAMESPACE = re.compile(r'^/api/v\d+/([^/]+)')
+
+# Request latencies, in seconds; reads are mostly well under 100 ms, bcrypt logins around 250 ms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class PrometheusMetrics(object):
+    '''Request latency and status metrics per route, pool, cache and bcrypt figures, served
+    at /metrics in the Prometheus text format.
+
+    Under gunicorn every worker keeps its own values, so when PROMETHEUS_MULTIPROC_DIR is
+    set prometheus_client writes them to memory-mapped files in that directory and any
+    worker answering /metrics reads all of them. Gauges are set by each worker as it
+    serves requests, and summed over the live workers.'''
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = None
+
+    def init_app(self, app, pool_metrics, hasher):
+        self.pool_metrics = pool_metrics
+        self.hasher = hasher
+        if self.requests is None:
+            self.create_metrics()
+        app.before_request(self.start)
+        app.after_request(self.finish)
+        app.add_url_rule(app.config.get('METRICS_PATH', '/metrics'), 'metrics', self.metrics_response)
+
+    def create_metrics(self):
+        # prometheus_client is only imported by apps actually serving metrics
+        from prometheus_client import Counter, Gauge, Histogram
+
+        labels = ('namespace', 'route', 'method')
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Time spent answering requests',
+            labels, buckets=LATENCY_BUCKETS
+        )
+        self.requests = Counter('http_requests', 'Requests answered', labels + ('status',))
+        self.cache_hits = Counter('cache_hits', 'Page and principal cache lookups that found a value')
+        self.cache_misses = Counter('cache_misses', 'Page and principal cache lookups that found nothing')
+        self.pool_checked_out = Gauge(
+            'db_pool_checked_out', 'Connections in use', ('bind',), multiprocess_mode='livesum'
+        )
+        self.pool_checked_in = Gauge(
+            'db_pool_checked_in', 'Idle connections kept open', ('bind',), multiprocess_mode='livesum'
+        )
+        self.pool_overflow = Gauge(
+            'db_pool_overflow', 'Connections opened beyond the pool size', ('bind',), multiprocess_mode='livesum'
+        )
+        self.pool_timeouts = Counter('db_pool_checkout_timeouts', 'Checkouts that gave up waiting', ('bind',))
+        self.pool_wait = Counter('db_pool_wait_seconds', 'Time spent waiting for a connection', ('bind',))
+        self.bcrypt_queue_depth = Gauge(
+            'bcrypt_queue_depth', 'Password hashes running or queued', multiprocess_mode='livesum'
+        )
+        # PoolMetrics keeps running totals, only their increase is added to the counters
+        self._pool_totals = {}
+
+    def start(self):
+        g.metrics_start = time.perf_counter()
+
+    def finish(self, response):
+        start = g.pop('metrics_start', None)
+        if start is None or request.endpoint == 'metrics':
+            return response
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        match = NAMESPACE.match(route)
+        labels = (match.group(1) if match else '', route, request.method)
+        self.latency.labels(*labels).observe(time.perf_counter() - start)
+        self.requests.labels(*labels, str(response.status_code)).inc()
+        timings = current_timings()
+        if timings is not None:
+            self.cache_hits.inc(timings.cache_hits)
+            self.cache_misses.inc(timings.cache_misses)
+        self.update_gauges()
+        return response
+
+    def update_gauges(self):
+        for stats in self.pool_metrics.snapshot():
+            bind = stats['bind']
+            self.pool_checked_out.labels(bind).set(stats.get('checked_out', 0))
+            self.pool_checked_in.labels(bind).set(stats.get('checked_in', 0))
+            self.pool_overflow.labels(bind).set(stats.get('overflow', 0))
+            with self._lock:
+                timeouts, wait_seconds = self._pool_totals.get(bind, (0, 0.0))
+                self._pool_totals[bind] = (stats['timeouts'], stats['wait_seconds_total'])
+            # Totals start over in each forked worker
+            self.pool_timeouts.labels(bind).inc(max(stats['timeouts'] - timeouts, 0))
+            self.pool_wait.labels(bind).inc(max(stats['wait_seconds_total'] - wait_seconds, 0))
+        self.bcrypt_queue_depth.set(self.hasher.queue_depth)
+
+    def metrics_response(self):
+        from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+        from prometheus_client.multiprocess import MultiProcessCollector
+
+        self.update_gauges()
+        registry = REGISTRY
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            MultiProcessCollector(registry)
+        return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,75 @@
+from contextlib import contextmanager
+
+from flask import current_app, g, has_request_context
+from sqlalchemy import event
+
+from extensions import cache, db
+from logger import log
+from src.main.routing_session import REPLICA_BIND, RoutingSession
+
+def has_replica() -> bool:
+    return REPLICA_BIND in db.engines
+
+def sticky_key(user_id: int) -> str:
+    return 'replica_sticky:{}'.format(user_id)
+
+def get_request_user_id() -> int:
+    user = g.get('current_user') if has_request_context() else None
+    return user.id if user else None
+
+def is_sticky(*user_ids) -> bool:
+    '''Whether any of these users wrote recently enough that the replica may not have caught up'''
+    if has_request_context() and g.get('replica_sticky'):
+        return True
+    keys = [sticky_key(user_id) for user_id in user_ids if user_id is not None]
+    if not keys:
+        return False
+    try:
+        return any(cache.get_many(*keys))
+    except Exception as e:
+        # Falling back to the primary is always correct, only slower
+        log.error('%s', e.args)
+        return True
+
+def mark_sticky(user_id: int):
+    if has_request_context():
+        g.replica_sticky = True
+    if user_id is None:
+        return
+    try:
+        cache.set(sticky_key(user_id), 1, timeout=current_app.config['REPLICA_STICKY_SECONDS'])
+    except Exception as e:
+        log.error('%s', e.args)
+
+@contextmanager
+def replica_reads(*user_ids):
+    '''Route plain SELECTs in this block to the replica, unless the requesting user
+    or any of user_ids wrote within the last REPLICA_STICKY_SECONDS'''
+    session = db.session()
+    if not has_replica() or session.info.get('replica') or is_sticky(get_request_user_id(), *user_ids):
+        yield
+        return
+    session.info['replica'] = True
+    try:
+        yield
+    finally:
+        session.info.pop('replica', None)
+
+# Remember writes, both ORM flushes and bulk statements, and make their author sticky on commit
+@event.listens_for(RoutingSession, 'after_flush')
+def record_flush(session, flush_context):
+    session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def record_bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+def stick_after_write(session):
+    if session.info.pop('wrote', False) and has_replica():
+        mark_sticky(get_request_user_id())
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def forget_write(session):
+    session.info.pop('wrote', None)
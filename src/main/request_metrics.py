@@ -0,0 +1,141 @@
+import json
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from logger import log
+
+# Repeated statements differing only in their parameters, including the length of IN lists
+IN_LIST = re.compile(r'IN \([^()]*\)')
+WHITESPACE = re.compile(r'\s+')
+
+class Timings(object):
+    '''What one request spent, and where'''
+
+    __slots__ = ('start', 'queries', 'sql_seconds', 'statements', 'phases', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.statements = Counter()
+        self.phases = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def add_phase(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+def current_timings() -> Timings:
+    if not has_request_context():
+        return None
+    return g.get('request_timings')
+
+@contextmanager
+def timed(phase: str):
+    '''Add the time spent in this block to phase, when inside an instrumented request'''
+    timings = current_timings()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add_phase(phase, time.perf_counter() - start)
+
+def normalize_statement(statement: str) -> str:
+    return IN_LIST.sub('IN (?)', WHITESPACE.sub(' ', statement)).strip()
+
+def count_cache_lookup(hit: bool):
+    '''Count a hit or a miss of a page or principal cache in the current request'''
+    timings = current_timings()
+    if timings is None:
+        return
+    if hit:
+        timings.cache_hits += 1
+    else:
+        timings.cache_misses += 1
+
+@contextmanager
+def memoized_lookup():
+    '''Count a call of a memoized function as a hit, unless its body counted a miss'''
+    timings = current_timings()
+    misses = timings.cache_misses if timings is not None else 0
+    yield
+    if timings is not None and timings.cache_misses == misses:
+        timings.cache_hits += 1
+
+class RequestMetrics(object):
+    '''Per-request SQL, phase and cache timings, reported in a Server-Timing header and
+    a log line, with a warning when a request repeats the same statement (N+1 queries)'''
+
+    def init_app(self, app, db):
+        self.server_timing = app.config.get('SERVER_TIMING', True)
+        self.repeated_query_threshold = app.config.get('REPEATED_QUERY_THRESHOLD', 5)
+        with app.app_context():
+            for engine in db.engines.values():
+                self.track(engine)
+        app.before_request(self.start)
+        app.after_request(self.finish)
+
+    def track(self, engine):
+        event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+
+    def start(self):
+        g.request_timings = Timings()
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if current_timings() is not None:
+            conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        timings = current_timings()
+        if timings is None or not conn.info.get('query_start'):
+            return
+        timings.sql_seconds += time.perf_counter() - conn.info['query_start'].pop()
+        timings.queries += 1
+        timings.statements[normalize_statement(statement)] += 1
+
+    def finish(self, response):
+        timings = current_timings()
+        if timings is None:
+            return response
+        total = time.perf_counter() - timings.start
+        if self.server_timing:
+            response.headers['Server-Timing'] = self.server_timing_header(timings, total)
+        log.info('request %s', json.dumps(self.summary(timings, total, response.status_code)))
+        for statement, count in timings.statements.items():
+            if count >= self.repeated_query_threshold:
+                log.warning(
+                    'Possible N+1 queries: %s %s ran %s times: %s',
+                    request.method, request.path, count, statement
+                )
+        return response
+
+    def server_timing_header(self, timings: Timings, total: float) -> str:
+        metrics = ['db;dur={:.1f};desc="{} queries"'.format(timings.sql_seconds * 1000, timings.queries)]
+        metrics += ['{};dur={:.1f}'.format(name, seconds * 1000) for name, seconds in timings.phases.items()]
+        metrics.append('cache;desc="{} hits, {} misses"'.format(timings.cache_hits, timings.cache_misses))
+        metrics.append('total;dur={:.1f}'.format(total * 1000))
+        return ', '.join(metrics)
+
+    def summary(self, timings: Timings, total: float, status: int) -> dict:
+        return {
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': status,
+            'total_ms': round(total * 1000, 2),
+            'sql_ms': round(timings.sql_seconds * 1000, 2),
+            'queries': timings.queries,
+            'distinct_queries': len(timings.statements),
+            'phases_ms': {name: round(seconds * 1000, 2) for name, seconds in timings.phases.items()},
+            'cache_hits': timings.cache_hits,
+            'cache_misses': timings.cache_misses,
+        }
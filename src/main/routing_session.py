@@ -0,0 +1,20 @@
+import sqlalchemy as sa
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = 'replica'
+
+class RoutingSession(Session):
+    '''Sends plain SELECTs to the replica bind while reads are marked with
+    session.info['replica'], and everything else to the primary. The replica
+    is optional; without a 'replica' entry in SQLALCHEMY_BINDS all queries use the primary.'''
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('replica') and not self._flushing and is_read(clause):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def is_read(clause) -> bool:
+    # Locking reads must see the primary's rows
+    return isinstance(clause, sa.Select) and clause._for_update_arg is None
@@ -0,0 +1,62 @@
+from sqlalchemy import bindparam, text
+
+from extensions import db
+from src.main.constants import STATUS_LIVE
+
+POST_FTS_TABLE = 'post_fts'
+POST_FULLTEXT_INDEX = 'ix_post_fulltext'
+
+SQLITE_SEARCH = text(
+    'SELECT post.id FROM post_fts JOIN post ON post.id = post_fts.rowid '
+    'WHERE post_fts MATCH :query AND post.status = :status '
+    'ORDER BY post_fts.rank LIMIT :limit OFFSET :offset'
+)
+MYSQL_SEARCH = text(
+    'SELECT id FROM post '
+    'WHERE MATCH (title, content) AGAINST (:query IN NATURAL LANGUAGE MODE) '
+    'AND status = :status '
+    'ORDER BY MATCH (title, content) AGAINST (:query IN NATURAL LANGUAGE MODE) DESC, id '
+    'LIMIT :limit OFFSET :offset'
+)
+
+def get_dialect_name() -> str:
+    return db.session.get_bind().dialect.name
+
+def build_match_query(query: str) -> str:
+    '''Quote each term so user input is never parsed as FTS5 query syntax'''
+    terms = query.split()
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+def index_posts(posts: list):
+    '''Mirror posts into the SQLite FTS5 table; MySQL maintains its FULLTEXT index itself'''
+    index_post_rows([{'id': post.id, 'title': post.title, 'content': post.content} for post in posts])
+
+def index_post_rows(rows: list):
+    if not rows or get_dialect_name() != 'sqlite':
+        return
+    db.session.execute(text('DELETE FROM post_fts WHERE rowid = :id'), rows)
+    db.session.execute(
+        text('INSERT INTO post_fts (rowid, title, content) VALUES (:id, :title, :content)'),
+        rows
+    )
+
+def reindex_post_ids(post_ids: list):
+    '''Re-read posts changed by bulk statements and mirror them into the FTS5 table'''
+    if not post_ids or get_dialect_name() != 'sqlite':
+        return
+    rows = db.session.execute(
+        text('SELECT id, title, content FROM post WHERE id IN :ids').bindparams(bindparam('ids', expanding=True)),
+        {'ids': list(post_ids)}
+    )
+    index_post_rows([row._asdict() for row in rows])
+
+def search_post_ids(query: str, limit: int, offset: int) -> list:
+    '''Ids of live posts matching query, best match first'''
+    if get_dialect_name() == 'sqlite':
+        statement, query = SQLITE_SEARCH, build_match_query(query)
+    else:
+        statement = MYSQL_SEARCH
+    if not query:
+        return []
+    params = {'query': query, 'status': STATUS_LIVE, 'limit': limit, 'offset': offset}
+    return db.session.execute(statement, params).scalars().all()
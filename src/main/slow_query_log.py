@@ -0,0 +1,98 @@
+import json
+import sys
+import time
+
+from sqlalchemy import event
+
+from logger import log
+from src.main.request_metrics import normalize_statement
+from src.main.ttl_cache import TTLCache
+
+# Frames of these modules are reported as the caller of a slow query
+CONTROLLERS = 'src.main.controllers.'
+
+class SlowQueryLog(object):
+    '''Logs statements slower than SLOW_QUERY_SECONDS with the types of their bound parameters,
+    the controller function that ran them and the database's plan for them. Each statement,
+    ignoring its parameters, is logged at most once per SLOW_QUERY_LOG_INTERVAL seconds.'''
+
+    def __init__(self):
+        self.threshold = None
+        self._logged = TTLCache()
+
+    def init_app(self, app, db):
+        self.threshold = app.config.get('SLOW_QUERY_SECONDS')
+        self._logged.maxsize = app.config.get('SLOW_QUERY_LOG_SIZE', 256)
+        self._logged.ttl = app.config.get('SLOW_QUERY_LOG_INTERVAL', 60)
+        self._logged.clear()
+        if self.threshold is None:
+            return
+        with app.app_context():
+            for engine in db.engines.values():
+                self.track(engine)
+
+    def track(self, engine):
+        event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_start', []).append(time.perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not conn.info.get('slow_query_start'):
+            return
+        seconds = time.perf_counter() - conn.info['slow_query_start'].pop()
+        if self.threshold is None or seconds < self.threshold:
+            return
+        key = normalize_statement(statement)
+        if self._logged.get(key) is not None:
+            return
+        self._logged.set(key, True)
+        log.warning('slow query %s', json.dumps({
+            'ms': round(seconds * 1000, 2),
+            'caller': find_caller(),
+            'statement': statement,
+            'parameters': describe_parameters(parameters, executemany),
+            'plan': None if executemany or streaming(context) else explain(conn, statement, parameters),
+        }))
+
+def find_caller() -> str:
+    '''module.function:line of the innermost controller frame running the query'''
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith(CONTROLLERS):
+            return '{}.{}:{}'.format(module[len(CONTROLLERS):], frame.f_code.co_name, frame.f_lineno)
+        frame = frame.f_back
+    return None
+
+def describe_parameters(parameters, executemany: bool) -> dict:
+    '''Row count and value types of the bound parameters. The values themselves are never
+    logged: they include password hashes, emails and post bodies.'''
+    rows = list(parameters or ()) if executemany else [parameters or ()]
+    first = rows[0] if rows else ()
+    if isinstance(first, dict):
+        types = {name: type(value).__name__ for name, value in first.items()}
+    else:
+        types = [type(value).__name__ for value in first]
+    return {'rows': len(rows), 'types': types}
+
+def streaming(context) -> bool:
+    '''Whether the statement's results are read through a server-side cursor, which keeps
+    the connection busy until they are all fetched'''
+    return context is not None and bool(context.execution_options.get('stream_results'))
+
+def explain(conn, statement: str, parameters) -> list:
+    '''Plan rows for a read, from a cursor of its own so the query's results are untouched'''
+    if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    prefix = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return [' | '.join(str(value) for value in row) for row in cursor.fetchall()]
+    except Exception as e:
+        log.error('%s', e.args)
+        return None
+    finally:
+        cursor.close()
@@ -0,0 +1,175 @@
+import csv
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from itertools import islice
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from logger import log
+from src.main.constants import STATUS_ACTIVE
+from src.main.hashing import hash_password
+from src.main.models.user import User
+
+IMPORT_COLUMNS = ('username', 'email', 'password')
+# Passwords sent to a hashing process at a time; bcrypt dwarfs the pickling cost either way
+HASH_CHUNK_SIZE = 16
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_hash_pool(workers: int = None) -> ProcessPoolExecutor:
+    '''Process pool shared by every import of this process, started by the first one.
+    Concurrent imports queue their hashes on it rather than start processes of their own.'''
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn rather than fork, since the caller may be a threaded web worker
+            context = multiprocessing.get_context('spawn')
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return _pool
+
+def shutdown_hash_pool():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool:
+        pool.shutdown(wait=True)
+
+class UserImport(object):
+    '''Imports users from CSV rows in chunks: each chunk is checked for conflicts
+    with two IN queries, hashed across a process pool and inserted in one transaction.
+    Rows that cannot be imported are reported by line number instead of aborting.'''
+
+    def __init__(self, log_rounds: int, chunk_size: int = 1000, workers: int = None):
+        self.log_rounds = log_rounds
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.imported = 0
+        self.errors = []
+        self._usernames = set()
+        self._emails = set()
+        # Core insert, since the ORM bulk path would read the write-only password_hash hybrid
+        self.insert_statement = User.__table__.insert()
+
+    def run(self, lines) -> dict:
+        reader = csv.DictReader(lines)
+        missing = [name for name in IMPORT_COLUMNS if name not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError('Missing CSV columns: {}.'.format(', '.join(missing)))
+        pool = get_hash_pool(self.workers)
+        rows = ((reader.line_num, row) for row in reader)
+        try:
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                self.import_chunk(chunk, pool)
+        except BrokenProcessPool:
+            # A hashing process died; start a fresh pool for the next import
+            shutdown_hash_pool()
+            raise
+        self.errors.sort(key=lambda error: error['line'])
+        log.info('%s users imported, %s rows rejected', self.imported, len(self.errors))
+        return {'imported': self.imported, 'failed': len(self.errors), 'errors': self.errors}
+
+    def import_chunk(self, chunk: list, pool: ProcessPoolExecutor):
+        candidates = [(line, row) for line, row in chunk if self.check_row(line, row)]
+        candidates = self.check_existing(candidates)
+        if not candidates:
+            return
+        passwords = [row['password'] for _, row in candidates]
+        hashes = pool.map(
+            hash_password,
+            passwords,
+            [self.log_rounds] * len(passwords),
+            chunksize=HASH_CHUNK_SIZE
+        )
+        rows = [self.make_user_row(row, password_hash) for (_, row), password_hash in zip(candidates, hashes)]
+        try:
+            db.session.execute(self.insert_statement, rows)
+            db.session.commit()
+            self.imported += len(rows)
+        except IntegrityError:
+            # Someone else created a conflicting user since the pre-check; retry one by one
+            db.session.rollback()
+            self.insert_one_by_one(candidates, rows)
+
+    def check_row(self, line: int, row: dict) -> bool:
+        errors = {
+            name: 'Missing required value.'
+            for name in IMPORT_COLUMNS
+            if not (row.get(name) or '').strip()
+        }
+        if errors:
+            return self.reject(line, row, errors)
+        username, email = row['username'].strip(), row['email'].strip()
+        if username in self._usernames:
+            errors['username'] = 'Duplicate username in file.'
+        if email in self._emails:
+            errors['email'] = 'Duplicate email in file.'
+        self._usernames.add(username)
+        self._emails.add(email)
+        if errors:
+            return self.reject(line, row, errors)
+        row['username'], row['email'] = username, email
+        return True
+
+    def check_existing(self, candidates: list) -> list:
+        if not candidates:
+            return candidates
+        usernames = set(db.session.scalars(
+            select(User.username).where(User.username.in_([row['username'] for _, row in candidates]))
+        ))
+        emails = set(db.session.scalars(
+            select(User.email).where(User.email.in_([row['email'] for _, row in candidates]))
+        ))
+        remaining = []
+        for line, row in candidates:
+            errors = {}
+            if row['username'] in usernames:
+                errors['username'] = 'Username already exists.'
+            if row['email'] in emails:
+                errors['email'] = 'Email already exists.'
+            if errors:
+                self.reject(line, row, errors)
+            else:
+                remaining.append((line, row))
+        return remaining
+
+    def insert_one_by_one(self, candidates: list, rows: list):
+        for (line, row), user_row in zip(candidates, rows):
+            try:
+                db.session.execute(self.insert_statement, [user_row])
+                db.session.commit()
+                self.imported += 1
+            except IntegrityError:
+                db.session.rollback()
+                self.reject(line, row, {'': 'Database conflict.'})
+
+    def make_user_row(self, row: dict, password_hash: str) -> dict:
+        now = datetime.now(timezone.utc)
+        return {
+            'public_id': str(uuid.uuid4()),
+            'username': row['username'],
+            'email': row['email'],
+            '_password_hash': password_hash,
+            'admin': False,
+            'status': STATUS_ACTIVE,
+            'created_at': now,
+            'updated_at': now
+        }
+
+    def reject(self, line: int, row: dict, errors: dict) -> bool:
+        self.errors.append({
+            'line': line,
+            'username': row.get('username'),
+            'email': row.get('email'),
+            'errors': errors
+        })
+        return False
@@ -0,0 +1,20 @@
+from flask_restx import Resource
+
+from src.main.controllers.admin_controller import get_pool_stats_response
+from src.main.views.decorators import admin_required
+from src.main.views.schemas import (
+    pool_stats_response,
+    admin_ns as api
+)
+
+@api.route('/pool')
+class PoolStats(Resource):
+    @api.doc('get_pool_stats', description='Database connection pool usage of the worker answering the request, per bind.')
+    @api.marshal_with(pool_stats_response, as_list=True)
+    @api.response(200, 'Pool stats fetched successfully.')
+    @api.response(401, 'Unauthorized.')
+    @api.response(403, 'Forbidden.')
+    @api.response(500, 'An error occurred.')
+    @admin_required
+    def get(self, current_user):
+        return get_pool_stats_response()
@@ -0,0 +1,131 @@
+import json
+import re
+from urllib.parse import parse_qsl
+
+from flask import abort
+from flask_restx import inputs
+import jwt
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from werkzeug.exceptions import HTTPException
+
+from logger import log
+from src.main.controllers.async_post_controller import (
+    get_post_response,
+    get_posts_response,
+    get_principal_by_public_id,
+    get_user_posts_response
+)
+
+JSON_HEADERS = [(b'content-type', b'application/json')]
+
+class AsgiApp(object):
+    '''Read-only ASGI app serving the post GET endpoints of api/v1 from an async engine.
+    Everything else, writes included, stays on the WSGI app.'''
+
+    def __init__(self, engine, secret_key: str):
+        self.engine = engine
+        self.sessions = async_sessionmaker(engine, expire_on_commit=False)
+        self.secret_key = secret_key
+        self.routes = [
+            (re.compile(r'^/api/v1/post/?$'), self.get_posts),
+            (re.compile(r'^/api/v1/post/(?P<id>\d+)$'), self.get_post),
+            (re.compile(r'^/api/v1/user/(?P<id>\d+)/posts$'), self.get_user_posts),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            return
+        try:
+            body, code = await self.dispatch(scope)
+        except HTTPException as e:
+            body, code = json.dumps({'message': e.description}).encode('utf-8'), e.code
+        except Exception as e:
+            log.error('%s', e.args)
+            body, code = json.dumps({'message': 'An error occurred.'}).encode('utf-8'), 500
+        if code == 204 or scope['method'] == 'HEAD':
+            body = b''
+        await send({'type': 'http.response.start', 'status': code, 'headers': JSON_HEADERS})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def dispatch(self, scope):
+        for pattern, handler in self.routes:
+            match = pattern.match(scope['path'])
+            if match:
+                break
+        else:
+            abort(404, 'Not found.')
+        if scope['method'] not in ('GET', 'HEAD'):
+            abort(405, 'Method not allowed.')
+        args = dict(parse_qsl(scope['query_string'].decode('latin-1')))
+        async with self.sessions() as session:
+            current_user = await self.get_user_from_token(session, scope)
+            return await handler(session, args, current_user, **match.groupdict())
+
+    async def get_user_from_token(self, session, scope):
+        token = dict(scope['headers']).get(b'authorization')
+        if not token:
+            return None
+        try:
+            data = jwt.decode(token.decode('latin-1'), self.secret_key, algorithms=['HS256'])
+            return await get_principal_by_public_id(session, data['public_id'])
+        except:
+            return None
+
+    async def get_posts(self, session, args: dict, current_user):
+        return await get_posts_response(
+            session,
+            parse_limit(args),
+            args.get('cursor'),
+            args.get('fields'),
+            parse_include_deleted(args),
+            current_user
+        )
+
+    async def get_post(self, session, args: dict, current_user, id: str):
+        return await get_post_response(
+            session,
+            int(id),
+            args.get('fields'),
+            parse_include_deleted(args),
+            current_user
+        )
+
+    async def get_user_posts(self, session, args: dict, current_user, id: str):
+        return await get_user_posts_response(
+            session,
+            int(id),
+            parse_limit(args),
+            args.get('cursor'),
+            args.get('fields'),
+            parse_include_deleted(args),
+            current_user
+        )
+
+# Same rules as page_args and fields_args in schemas
+def parse_limit(args: dict) -> int:
+    if not args.get('limit'):
+        return None
+    try:
+        return int(args['limit'])
+    except ValueError:
+        abort(400, 'Invalid limit.')
+
+def parse_include_deleted(args: dict) -> bool:
+    if not args.get('include_deleted'):
+        return False
+    try:
+        return inputs.boolean(args['include_deleted'])
+    except ValueError:
+        abort(400, 'Invalid include_deleted.')
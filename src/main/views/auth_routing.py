@@ -17,6 +17,7 @@ class UserLogin(Resource):
     @api.response(401, 'Login required.')
     @api.response(403, 'Unable to authenticate.')
     @api.response(500, 'An error occurred.')
+    @api.response(503, 'Server busy, try again later.')
     def post(self):
         return login_user(request.json)
     
@@ -29,5 +30,6 @@ class UserSignup(Resource):
     @api.response(400, 'Bad input.')
     @api.response(409, 'Database conflict.')
     @api.response(500, 'An error occurred.')
+    @api.response(503, 'Server busy, try again later.')
     def post(self):
         return signup_user(request.json)
@@ -1,9 +1,17 @@
-from flask import abort, current_app, request
+from datetime import timezone
+from flask import abort, current_app, g, request, Response
+from flask_restx import marshal
+from flask_restx.utils import merge, unpack
 from functools import wraps
+import hashlib
 import jwt
+from werkzeug.http import http_date, quote_etag
 
-from src.main.controllers.user_controller import get_user_by_public_id
-from src.main.models.user import User
+from src.main.controllers.post_controller import parse_fields
+from src.main.controllers.user_controller import get_principal_by_public_id
+from src.main.models.principal import Principal
+from src.main.request_metrics import timed
+from src.main.views.serializers import DICT, OBJECT, dumps, get_serializer
 
 def jwt_required(f):
     @wraps(f)
@@ -28,7 +36,15 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated
 
-def get_user_from_token() -> User:
+def jwt_optional(f):
+    '''Like jwt_required, but passes current_user=None instead of rejecting anonymous requests'''
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        kwargs['current_user'] = get_user_from_token()
+        return f(*args, **kwargs)
+    return decorated
+
+def get_user_from_token() -> Principal:
     token = None
     if 'Authorization' in request.headers:
         token = request.headers['Authorization']
@@ -36,7 +52,90 @@ def get_user_from_token() -> User:
         return None
     try:
         data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-        current_user = get_user_by_public_id(data['public_id'])
+        current_user = get_principal_by_public_id(data['public_id'])
     except:
         return None
+    # Lets lower layers, such as replica routing, know who is asking
+    g.current_user = current_user
     return current_user
+
+def marshal_fields(model, items: str = None):
+    '''Marshal like marshal_with, keeping only the fields named in the `fields` query parameter'''
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            with timed('controller'):
+                data, code = f(*args, **kwargs)
+            if isinstance(data, bytes):
+                # Already encoded by the controller, usually straight from the cache
+                return Response(data, status=code, mimetype='application/json')
+            fields = parse_fields(request.args.get('fields'))
+            return json_response(data, code, model, fields, items)
+        return decorated
+    return decorator
+
+def serialize_with(model, as_list: bool = False, code: int = 200, description: str = None):
+    '''Namespace.marshal_with for read paths: documented identically, encoded by a
+    compiled serializer. An X-Fields mask is still applied by flask_restx.'''
+    def decorator(f):
+        f.__apidoc__ = merge(getattr(f, '__apidoc__', {}), {
+            'responses': {str(code): (description, [model] if as_list else model, {})},
+            '__mask__': True
+        })
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            with timed('controller'):
+                data, status, headers = unpack(f(*args, **kwargs))
+            mask = request.headers.get(current_app.config['RESTX_MASK_HEADER'])
+            if mask:
+                return marshal(data, model, mask=mask), status, headers
+            response = json_response(data, status, model)
+            response.headers.update(headers)
+            return response
+        return decorated
+    return decorator
+
+def json_response(data, code: int, model, fields: tuple = None, items: str = None) -> Response:
+    with timed('marshal'):
+        if isinstance(data, (list, tuple)):
+            serialize = get_serializer(model, fields, OBJECT, items)
+            body = dumps([serialize(item) for item in data])
+        else:
+            body = dumps(get_serializer(model, fields, DICT if isinstance(data, dict) else OBJECT, items)(data))
+    return Response(body, status=code, mimetype='application/json')
+
+def conditional(get_version):
+    '''Answer If-None-Match/If-Modified-Since with a 304 before the view queries or marshals anything.
+    get_version gets the view's keyword arguments, current_user included when applied below
+    jwt_optional, and must only version what that caller is allowed to read.'''
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            version, last_modified = get_version(**kwargs)
+            if not version:
+                return f(*args, **kwargs)
+            etag = make_etag(version)
+            last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+            headers = {'ETag': quote_etag(etag), 'Last-Modified': http_date(last_modified)}
+            if is_not_modified(etag, last_modified):
+                return Response(status=304, headers=headers)
+            response = f(*args, **kwargs)
+            if isinstance(response, Response):
+                response.headers.update(headers)
+                return response
+            data, code = response
+            return data, code, headers
+        return decorated
+    return decorator
+
+def make_etag(version: str) -> str:
+    # Query parameters such as fields, limit and cursor change the representation
+    representation = '{}?{}'.format(version, request.query_string.decode('utf-8'))
+    return hashlib.sha1(representation.encode('utf-8')).hexdigest()
+
+def is_not_modified(etag: str, last_modified) -> bool:
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since:
+        return last_modified <= request.if_modified_since
+    return False
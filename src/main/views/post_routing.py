@@ -1,29 +1,64 @@
 from flask import request
 from flask_restx import Resource
 
-from src.main.views.decorators import jwt_required
+from src.main.views.decorators import (
+    admin_required,
+    conditional,
+    jwt_optional,
+    jwt_required,
+    marshal_fields,
+    serialize_with
+)
 from src.main.controllers.post_controller import (
     create_post_response,
+    create_posts_response,
     delete_post_response,
+    delete_posts_response,
+    export_posts_response,
+    get_post_changes_response,
     get_post_response,
+    get_post_version,
     get_posts_response,
-    update_post_response
+    search_posts_response,
+    update_post_response,
+    update_posts_response
 )
 from src.main.views.schemas import (
+    changes_args,
+    export_args,
+    fields_args,
+    page_args,
+    post_batch_delete_request,
+    post_batch_response,
+    post_batch_update_request,
+    post_changes_response,
+    post_page_response,
     post_request,
     post_response,
+    post_search_request,
     post_ns as api
 )
 
 @api.route('/')
 class PostList(Resource):
     @api.doc('list_posts')
-    @api.marshal_list_with(post_response)
-    @api.response(200, 'Posts fetched successfully.')
+    @api.expect(page_args)
+    @api.response(200, 'Posts fetched successfully.', post_page_response)
     @api.response(204, 'No posts found.')
+    @api.response(400, 'Invalid cursor or fields.')
+    @api.response(403, 'User is not an admin.')
     @api.response(500, 'An error occurred.')
-    def get(self):
-        return get_posts_response()
+    @marshal_fields(post_page_response, items='posts')
+    @jwt_optional
+    def get(self, current_user):
+        args = page_args.parse_args()
+        return get_posts_response(
+            args['limit'],
+            args['cursor'],
+            args['fields'],
+            args['include_deleted'],
+            current_user
+        )
 
     @api.doc('create_post')
     @api.expect(post_request, validate=True)
@@ -36,15 +71,108 @@ class PostList(Resource):
     def post(self, current_user):
         return create_post_response(request.json, current_user)
     
+@api.route('/batch')
+class PostBatch(Resource):
+    @api.doc(
+        'create_posts',
+        description='Create up to POST_BATCH_MAX_SIZE posts in one transaction. Each result carries the '
+                    'index of its item in the request and, for created posts, the new post id.'
+    )
+    @api.expect([post_request])
+    @api.marshal_with(post_batch_response, code=201)
+    @api.response(201, 'Posts created successfully.')
+    @api.response(207, 'Some posts were not valid.')
+    @api.response(400, 'Bad input.')
+    @api.response(401, 'Unauthorized.')
+    @api.response(413, 'Too many posts in one batch.')
+    @api.response(500, 'An error occurred.')
+    @jwt_required
+    def post(self, current_user):
+        return create_posts_response(request.json, current_user)
+
+    @api.doc('edit_posts')
+    @api.expect([post_batch_update_request])
+    @api.marshal_with(post_batch_response)
+    @api.response(200, 'Posts updated successfully.')
+    @api.response(207, 'Some posts were not updated.')
+    @api.response(400, 'Bad input.')
+    @api.response(401, 'Unauthorized.')
+    @api.response(413, 'Too many posts in one batch.')
+    @api.response(500, 'An error occurred.')
+    @jwt_required
+    def patch(self, current_user):
+        return update_posts_response(request.json, current_user)
+
+    @api.doc('delete_posts')
+    @api.expect(post_batch_delete_request, validate=True)
+    @api.marshal_with(post_batch_response)
+    @api.response(200, 'Posts deleted successfully.')
+    @api.response(207, 'Some posts were not deleted.')
+    @api.response(400, 'Bad input.')
+    @api.response(401, 'Unauthorized.')
+    @api.response(413, 'Too many posts in one batch.')
+    @api.response(500, 'An error occurred.')
+    @jwt_required
+    def delete(self, current_user):
+        return delete_posts_response(request.json, current_user)
+
+@api.route('/search')
+class PostSearch(Resource):
+    @api.doc('search_posts')
+    @api.expect(post_search_request, validate=True)
+    @serialize_with(post_page_response)
+    @api.response(200, 'Posts fetched successfully.')
+    @api.response(204, 'No posts found.')
+    @api.response(400, 'Bad input.')
+    @api.response(500, 'An error occurred.')
+    def post(self):
+        return search_posts_response(request.json)
+
+@api.route('/changes')
+class PostChanges(Resource):
+    @api.doc('list_post_changes')
+    @api.expect(changes_args)
+    @api.marshal_with(post_changes_response)
+    @api.response(200, 'Changes fetched successfully.')
+    @api.response(400, 'Invalid token.')
+    @api.response(500, 'An error occurred.')
+    def get(self):
+        args = changes_args.parse_args()
+        return get_post_changes_response(args['since'], args['limit'])
+
+@api.route('/export')
+class PostExport(Resource):
+    @api.doc('export_posts')
+    @api.expect(export_args)
+    @api.produces(['application/x-ndjson'])
+    @api.response(200, 'Posts streamed successfully.')
+    @api.response(400, 'Unsupported export format.')
+    @api.response(401, 'Unauthorized.')
+    @api.response(403, 'Forbidden.')
+    @api.response(500, 'An error occurred.')
+    @admin_required
+    def get(self, current_user):
+        args = export_args.parse_args()
+        return export_posts_response(args['format'], args['include_deleted'])
+
 @api.route('/<int:id>')
 class Post(Resource):
     @api.doc('get_post')
-    @api.marshal_with(post_response)
-    @api.response(200, 'Post fetched successfully.')
+    @api.expect(fields_args)
+    @api.response(200, 'Post fetched successfully.', post_response)
+    @api.response(304, 'Post not modified.')
+    @api.response(400, 'Unknown field requested.')
+    @api.response(403, 'User is not an admin.')
     @api.response(404, 'Post not found.')
     @api.response(500, 'An error occurred.')
-    def get(self, id):
-        return get_post_response(id)
+    @jwt_optional
+    @conditional(lambda id, current_user: get_post_version(
+        id, fields_args.parse_args()['include_deleted'], current_user
+    ))
+    @marshal_fields(post_response)
+    def get(self, id, current_user):
+        args = fields_args.parse_args()
+        return get_post_response(id, args['fields'], args['include_deleted'], current_user)
 
     @api.doc('edit_post')
     @api.expect(post_request, validate=True)
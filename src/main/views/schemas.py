@@ -1,4 +1,6 @@
-from flask_restx import Namespace, fields
+from flask_restx import inputs, Namespace, fields
+
+from src.main.constants import EXPORT_FORMAT_NDJSON, POST_TITLE_LENGTH
 
 # USERS
 user_ns = Namespace('user', description='User operations')
@@ -19,8 +21,31 @@ user_response = user_ns.model('UserResponse', {
     'id': fields.String(required=True, description='Unique user id'),
     'username': fields.String(required=True, description='Username'),
     'email': fields.String(required=True, description='User email'),
+    'post_count': fields.Integer(description='Posts written, deleted ones included'),
+    'live_post_count': fields.Integer(description='Posts not deleted'),
+  }
+)
+user_import_error = user_ns.model('UserImportError', {
+    'line': fields.Integer(required=True, description='CSV line of the rejected row'),
+    'username': fields.String(description='Username of the row'),
+    'email': fields.String(description='Email of the row'),
+    'errors': fields.Raw(required=True, description='Reason per column'),
+  }
+)
+user_import_response = user_ns.model('UserImportResponse', {
+    'imported': fields.Integer(required=True, description='Users created'),
+    'failed': fields.Integer(required=True, description='Rows rejected'),
+    'errors': fields.List(fields.Nested(user_import_error), description='Rejected rows'),
   }
 )
+user_list_args = user_ns.parser()
+user_list_args.add_argument(
+    'include_deleted',
+    type=inputs.boolean,
+    location='args',
+    default=False,
+    help='Also return deleted users'
+)
 
 # AUTH
 auth_ns = Namespace('auth', description='Auth operations')
@@ -41,7 +66,7 @@ signup_request = auth_ns.model('SignupRequest', {
 # POSTS
 post_ns = Namespace('post', description='Blog post operations')
 post_request = post_ns.model('PostRequest', {
-    'title': fields.String(required=True, description='Post title'),
+    'title': fields.String(required=True, description='Post title', max_length=POST_TITLE_LENGTH),
     'content': fields.String(required=True, description='Post content'),
   },
   strict=True
@@ -51,6 +76,115 @@ post_response = post_ns.model('PostResponse', {
     'author_id': fields.String(required=True, description='Post author'),
     'title': fields.String(required=True, description='Post title'),
     'content': fields.String(required=True, description='Post content'),
+    'excerpt': fields.String(required=True, description='Start of the post content'),
     'status': fields.String(required=True, description='Post status'),
   }
 )
+post_batch_update_request = post_ns.model('PostBatchUpdateRequest', {
+    'id': fields.Integer(required=True, description='Unique post id'),
+    'title': fields.String(required=False, description='Post title', max_length=POST_TITLE_LENGTH),
+    'content': fields.String(required=False, description='Post content'),
+  },
+  strict=True
+)
+post_batch_delete_request = post_ns.model('PostBatchDeleteRequest', {
+    'ids': fields.List(fields.Integer, required=True, description='Unique post ids'),
+  },
+  strict=True
+)
+post_batch_result = post_ns.model('PostBatchResult', {
+    'index': fields.Integer(required=True, description='Position of the item in the request'),
+    'id': fields.String(description='Unique post id; for creates, the id of the new post'),
+    'status': fields.Integer(required=True, description='HTTP status of the item'),
+    'errors': fields.Raw(description='Validation errors of the item'),
+  }
+)
+post_batch_response = post_ns.model('PostBatchResponse', {
+    'results': fields.List(fields.Nested(post_batch_result), description='Result per item'),
+  }
+)
+post_change = post_ns.model('PostChange', {
+    'id': fields.String(required=True, description='Unique post id'),
+    'author_id': fields.String(required=True, description='Post author'),
+    'title': fields.String(description='Post title, absent on tombstones'),
+    'content': fields.String(description='Post content, absent on tombstones'),
+    'excerpt': fields.String(description='Start of the post content, absent on tombstones'),
+    'status': fields.String(required=True, description='Post status'),
+    'updated_at': fields.DateTime(required=True, description='Time of the change'),
+    'deleted': fields.Boolean(required=True, description='Whether this is a tombstone for a deleted post'),
+  }
+)
+post_changes_response = post_ns.model('PostChangesResponse', {
+    'changes': fields.List(fields.Nested(post_change, skip_none=True), description='Changes, oldest first'),
+    'next_token': fields.String(description='Token to pass as since on the next call'),
+    'has_more': fields.Boolean(description='Whether more changes are ready right away'),
+  }
+)
+post_search_request = post_ns.model('PostSearchRequest', {
+    'query': fields.String(required=True, description='Words to match in post title or content'),
+    'limit': fields.Integer(required=False, description='Page size'),
+    'cursor': fields.String(required=False, description='Cursor from a previous page'),
+  },
+  strict=True
+)
+post_page_response = post_ns.model('PostPageResponse', {
+    'posts': fields.List(fields.Nested(post_response), description='Page of posts'),
+    'next_cursor': fields.String(description='Cursor for the next page, empty on the last page'),
+  }
+)
+fields_args = post_ns.parser()
+fields_args.add_argument(
+    'fields',
+    type=str,
+    location='args',
+    help='Comma separated post fields to return, for example id,title,excerpt'
+)
+fields_args.add_argument(
+    'include_deleted',
+    type=inputs.boolean,
+    location='args',
+    default=False,
+    help='Also return deleted posts (admin only)'
+)
+page_args = fields_args.copy()
+page_args.add_argument('limit', type=int, location='args', help='Page size')
+page_args.add_argument('cursor', type=str, location='args', help='Cursor from a previous page')
+changes_args = post_ns.parser()
+changes_args.add_argument('since', type=str, location='args', help='Token from a previous call, empty to start over')
+changes_args.add_argument('limit', type=int, location='args', help='Maximum changes to return')
+export_args = post_ns.parser()
+export_args.add_argument(
+    'format',
+    type=str,
+    location='args',
+    default=EXPORT_FORMAT_NDJSON,
+    help='Export format'
+)
+export_args.add_argument(
+    'include_deleted',
+    type=inputs.boolean,
+    location='args',
+    default=False,
+    help='Also export deleted posts'
+)
+
+# ADMIN
+admin_ns = Namespace('admin', description='Operational endpoints')
+pool_stats_response = admin_ns.model('PoolStatsResponse', {
+    'bind': fields.String(description='Database the pool connects to: default, or a SQLALCHEMY_BINDS key'),
+    'size': fields.Integer(description='Connections kept open by the pool'),
+    'checked_in': fields.Integer(description='Idle connections in the pool'),
+    'checked_out': fields.Integer(description='Connections currently in use'),
+    'overflow': fields.Integer(description='Connections open beyond size'),
+    'max_overflow': fields.Integer(description='Most connections allowed beyond size'),
+    'timeout': fields.Float(description='Seconds a checkout waits before giving up'),
+    'connects': fields.Integer(description='Connections opened'),
+    'checkouts': fields.Integer(description='Connections handed out'),
+    'checkins': fields.Integer(description='Connections returned'),
+    'invalidations': fields.Integer(description='Connections discarded as broken or stale'),
+    'timeouts': fields.Integer(description='Checkouts that gave up waiting'),
+    'wait_seconds_total': fields.Float(description='Time spent waiting for a connection'),
+    'wait_seconds_max': fields.Float(description='Longest wait for a connection'),
+    'wait_seconds_avg': fields.Float(description='Average wait for a connection'),
+  }
+)
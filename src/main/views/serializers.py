@@ -0,0 +1,84 @@
+import threading
+
+from flask_restx import fields as restx_fields
+import orjson
+
+# flask_restx's marshal walks the model and looks up every field of every object on every
+# call. For hot read paths the same schemas.py models are compiled once, per field
+# selection, into a plain function building the dict marshal would, which orjson encodes.
+# The models themselves, and so the Swagger docs, are untouched.
+
+# Where compiled functions read values from
+OBJECT = 'object'
+DICT = 'dict'
+ROW = 'row'
+
+_serializers = {}
+_lock = threading.Lock()
+
+def get_serializer(model, fields: tuple = None, source: str = OBJECT, items: str = None):
+    '''Compiled serializer for model, keeping only fields, or only fields of the
+    nested model under items; cached since models and field selections are few'''
+    key = (model.name, fields, source, items)
+    serializer = _serializers.get(key)
+    if serializer is None:
+        serializer = compile_serializer(model, fields, source, items)
+        with _lock:
+            _serializers[key] = serializer
+    return serializer
+
+def compile_serializer(model, fields: tuple = None, source: str = OBJECT, items: str = None):
+    '''Build a function turning one object, dict or row tuple into what
+    marshal(obj, model, mask) returns. ROW serializers read values by position,
+    in the order of their `columns` attribute.'''
+    names = tuple(model) if items or not fields else fields
+    namespace = {}
+    entries = []
+    for index, name in enumerate(names):
+        field = model[name]
+        nested_fields = fields if name == items else None
+        expression = compile_field(field, name, index, source, namespace, nested_fields)
+        entries.append('{!r}: {}'.format(name, expression))
+    code = 'def serialize(obj):\n    return {{{}}}\n'.format(',\n        '.join(entries))
+    exec(code, namespace)
+    serializer = namespace['serialize']
+    serializer.columns = names
+    return serializer
+
+def compile_field(field, name: str, index: int, source: str, namespace: dict, nested_fields: tuple = None) -> str:
+    '''Expression evaluating to field.output(name, obj)'''
+    none = 'none_{}'.format(index)
+    if source == ROW:
+        if isinstance(field, (restx_fields.Nested, restx_fields.List)):
+            raise ValueError('Row serializers only support flat models.')
+        value = 'obj[{}]'.format(index)
+    elif source == DICT:
+        value = 'obj.get({!r})'.format(field.attribute or name)
+    else:
+        value = 'getattr(obj, {!r}, None)'.format(field.attribute or name)
+
+    if isinstance(field, restx_fields.List) and isinstance(field.container, restx_fields.Nested):
+        namespace[none] = field.default
+        namespace['nested_{}'.format(index)] = get_serializer(field.container.nested, nested_fields)
+        return '{} if (v := {}) is None else [nested_{}(item) for item in v]'.format(none, value, index)
+
+    # Raw.output formats a missing value's default, when it is truthy
+    namespace[none] = field.format(field.default) if field.default else field.default
+    if type(field) in FORMATS and not field.mask:
+        return FORMATS[type(field)].format(none=none, value=value)
+
+    # Anything else is left to flask_restx itself
+    namespace['field_{}'.format(index)] = field
+    if source == ROW:
+        return '{} if (v := {}) is None else field_{}.format(v)'.format(none, value, index)
+    return 'field_{}.output({!r}, obj)'.format(index, name)
+
+FORMATS = {
+    restx_fields.Raw: '{none} if (v := {value}) is None else v',
+    restx_fields.String: '{none} if (v := {value}) is None else str(v)',
+    restx_fields.Integer: '{none} if (v := {value}) is None else int(v)',
+    restx_fields.Float: '{none} if (v := {value}) is None else float(v)',
+}
+
+def dumps(data) -> bytes:
+    return orjson.dumps(data)
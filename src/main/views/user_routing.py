@@ -1,22 +1,38 @@
+import io
+
 from flask_restx import Resource 
-from flask import request
+from flask import abort, request
 
-from src.main.controllers.post_controller import get_user_posts_response
+from src.main.controllers.post_controller import (
+    get_user_posts_response,
+    get_user_posts_version
+)
 from src.main.controllers.user_controller import (
     get_users_response,
+    import_users_response,
     get_user_response,
     delete_user_response,
     update_user_response,
     create_user_response
 )
 
-from src.main.views.decorators import admin_required, jwt_required
+from src.main.views.decorators import (
+    admin_required,
+    conditional,
+    jwt_optional,
+    jwt_required,
+    marshal_fields,
+    serialize_with
+)
 
 from src.main.views.schemas import (
     create_user_request,
     update_user_request,
     user_response,
-    post_response,
+    user_import_response,
+    user_list_args,
+    page_args,
+    post_page_response,
     user_ns as api
 )
 
@@ -31,12 +47,14 @@ class UserList(Resource):
     @api.response(403, 'Forbidden.')
     @api.response(409, 'Database conflict.')
     @api.response(500, 'An error occurred.')
+    @api.response(503, 'Server busy, try again later.')
     @admin_required
     def post(self, current_user):
         return create_user_response(request.json)
 
     @api.doc('list_users')
-    @api.marshal_list_with(user_response)
+    @api.expect(user_list_args)
+    @serialize_with(user_response, as_list=True)
     @api.response(200, 'Users fetched successfully.')
     @api.response(204, 'No users found.')
     @api.response(401, 'Unauthorized.')
@@ -44,19 +62,41 @@ class UserList(Resource):
     @api.response(500, 'An error occurred.')
     @admin_required
     def get(self, current_user):
-        return get_users_response()
+        args = user_list_args.parse_args()
+        return get_users_response(args['include_deleted'])
     
+@api.route('/import')
+class UserImport(Resource):
+    @api.doc('import_users', description='Create users from a text/csv body with username, email and password columns.')
+    @api.marshal_with(user_import_response, code=201)
+    @api.response(201, 'Users imported successfully.')
+    @api.response(207, 'Some rows were rejected.')
+    @api.response(400, 'Bad input.')
+    @api.response(401, 'Unauthorized.')
+    @api.response(403, 'Forbidden.')
+    @api.response(415, 'Expected text/csv.')
+    @api.response(500, 'An error occurred.')
+    @admin_required
+    def post(self, current_user):
+        if request.mimetype != 'text/csv':
+            abort(415, 'Expected text/csv.')
+        # Read the body as it arrives instead of buffering the whole file
+        charset = request.mimetype_params.get('charset', 'utf-8')
+        lines = io.TextIOWrapper(request.stream, encoding=charset, newline='')
+        return import_users_response(lines)
+
 @api.route('/<int:id>')
 class User(Resource):
     @api.doc('get_user')
-    @api.marshal_with(user_response)
+    @api.expect(user_list_args)
+    @serialize_with(user_response)
     @api.response(200, 'User fetched successfully.')
     @api.response(401, 'Unauthorized.')
     @api.response(404, 'User not found.')
     @api.response(500, 'An error occurred.')
     @admin_required
     def get(self, id, current_user):
-        return get_user_response(id)
+        return get_user_response(id, user_list_args.parse_args()['include_deleted'])
 
     @api.doc('update_user')
     @api.expect(update_user_request, validate=True)
@@ -83,10 +123,26 @@ class User(Resource):
 @api.route('/<int:id>/posts')
 class UserPosts(Resource):
     @api.doc('get_user_posts')
-    @api.marshal_list_with(post_response)
-    @api.response(200, 'User posts fetched successfully.')
+    @api.expect(page_args)
+    @api.response(200, 'User posts fetched successfully.', post_page_response)
     @api.response(204, 'No posts found.')
+    @api.response(304, 'User posts not modified.')
+    @api.response(400, 'Invalid cursor or fields.')
+    @api.response(403, 'User is not an admin.')
     @api.response(404, 'User not found.')
     @api.response(500, 'An error occurred.')
-    def get(self, id):
-        return get_user_posts_response(id)
+    @jwt_optional
+    @conditional(lambda id, current_user: get_user_posts_version(
+        id, page_args.parse_args()['include_deleted'], current_user
+    ))
+    @marshal_fields(post_page_response, items='posts')
+    def get(self, id, current_user):
+        args = page_args.parse_args()
+        return get_user_posts_response(
+            id,
+            args['limit'],
+            args['cursor'],
+            args['fields'],
+            args['include_deleted'],
+            current_user
+        )
@@ -0,0 +1,19 @@
+import pytest
+
+from src.main.controllers.admin_controller import get_pool_stats_response
+
+def test_get_pool_stats_response_success(mocker):
+    mocker.patch('src.main.controllers.admin_controller.pool_metrics.snapshot', return_value=[{'bind': 'default', 'checked_out': 3}])
+    response = get_pool_stats_response()
+    assert response[1] == 200
+    assert response[0][0]['checked_out'] == 3
+
+def test_get_pool_stats_response_exception(mocker):
+    mocker.patch(
+        'src.main.controllers.admin_controller.pool_metrics.snapshot',
+        side_effect=Exception('Mocked error')
+    )
+    with pytest.raises(Exception) as e:
+        get_pool_stats_response()
+    assert e.value.code == 500
+    assert e.value.description == 'An error occurred.'
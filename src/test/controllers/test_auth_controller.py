@@ -5,7 +5,9 @@ from src.test.fixtures.auth_fixtures import (
     mock_get_user_email,
     mock_get_user_email_empty,
     mock_check_password,
+    mock_check_password_busy,
     mock_check_password_fail,
+    mock_needs_rehash,
     secret_fixture,
     signup_user_dict_fixture
 )
@@ -27,6 +29,27 @@ def test_login_user_success(
     response = login_user(login_user_dict_fixture)
     assert response[1] == 200
 
+def test_login_user_rehash(
+        secret_fixture,
+        mock_get_user_email,
+        mock_check_password,
+        mock_needs_rehash,
+        login_user_dict_fixture,
+        user_fixture):
+    response = login_user(login_user_dict_fixture)
+    assert response[1] == 200
+    mock_needs_rehash.assert_called_once()
+
+def test_login_user_busy(
+        secret_fixture,
+        mock_get_user_email,
+        mock_check_password_busy,
+        login_user_dict_fixture):
+    with pytest.raises(Exception) as e:
+        login_user(login_user_dict_fixture)
+    assert e.value.code == 503
+    assert e.value.description == 'Server busy, try again later.'
+
 def test_login_user_unauthorized():
     with pytest.raises(Exception) as e:
         login_user({})
@@ -1,14 +1,38 @@
+import json
 import pytest
 
+from sqlalchemy import select
+from extensions import db
+from src.main.constants import EXCERPT_LENGTH, STATUS_DELETED, STATUS_LIVE
+from src.main.models.post import Post
+from src.main.models.principal import Principal
 from src.main.controllers.post_controller import (
     create_post_response,
+    create_posts_from_dicts,
+    create_posts_response,
+    delete_posts_response,
     delete_post_response,
+    export_posts_response,
+    export_statement,
+    get_post_changes_response,
     get_post_response,
+    get_post_version,
     get_posts_response,
+    get_user_posts,
+    get_user_posts_generation,
+    get_user_posts_page,
+    live_delta,
     get_user_posts_response,
-    update_post_response
+    get_user_posts_version,
+    invalidate_user_posts,
+    parse_fields,
+    search_posts_response,
+    update_post_response,
+    update_posts_from_dicts,
+    update_posts_response
 )
 from src.test.fixtures.post_fixtures import (
+    batch_post_list_fixture,
     create_post_dict_fixture,
     edit_post_dict_fixture,
     mock_db,
@@ -17,14 +41,49 @@ from src.test.fixtures.post_fixtures import (
     mock_get_post,
     mock_get_post_empty,
     mock_get_post_fail,
+    mock_get_post_view,
+    mock_get_post_view_empty,
+    mock_get_post_view_fail,
     mock_get_posts,
+    mock_get_posts_bad_cursor,
     mock_get_posts_empty,
     mock_get_user_posts,
     mock_get_user_posts_empty,
     mock_get_user_posts_fail,
+    mock_batch_max_size,
     mock_cache,
-    post_fixture
+    mock_create_posts,
+    mock_create_posts_fail,
+    mock_insert_db,
+    mock_mysql_insert_db,
+    mock_no_returning_insert_db,
+    mock_delete_posts,
+    mock_delete_posts_fail,
+    mock_get_post_authors,
+    mock_get_post_changes,
+    mock_get_post_changes_fail,
+    mock_update_posts,
+    mock_update_posts_gone,
+    mock_fetch_user_posts,
+    mock_fetch_user_posts_empty,
+    mock_generation_cache,
+    mock_get_user_posts_page,
+    mock_post_version_query,
+    mock_post_version_query_empty,
+    mock_replica_reads,
+    mock_search_posts,
+    mock_search_posts_empty,
+    mock_search_posts_fail,
+    mock_stream_posts,
+    mock_stream_posts_fail,
+    post_change_rows_fixture,
+    post_fixture,
+    post_view_fixture,
+    request_context_fixture,
+    search_post_dict_fixture,
+    updated_at_fixture
 )
+from src.test.fixtures.app_fixtures import sqlite_app_fixture
 from src.test.fixtures.user_fixtures import user_fixture
 
 # CREATE POST
@@ -38,6 +97,15 @@ def test_create_post_response_success(
     assert response[1] == 201
     assert response[0].title == post_fixture.title
 
+def test_create_post_response_excerpt(
+        mock_db,
+        mock_cache,
+        create_post_dict_fixture,
+        user_fixture):
+    create_post_dict_fixture['content'] = 'x' * (EXCERPT_LENGTH + 50)
+    response = create_post_response(create_post_dict_fixture, user_fixture)
+    assert response[0].excerpt == 'x' * EXCERPT_LENGTH
+
 def test_create_post_response_unauthorized(create_post_dict_fixture):
     with pytest.raises(Exception) as e:
         create_post_response(create_post_dict_fixture, None)
@@ -53,34 +121,238 @@ def test_create_post_response_exception(
     assert e.value.code == 500
     assert e.value.description == 'An error occurred.'
 
+# CREATE POSTS
+def test_create_posts_response_success(
+        mock_batch_max_size,
+        mock_create_posts,
+        mock_cache,
+        create_post_dict_fixture,
+        edit_post_dict_fixture,
+        user_fixture):
+    response = create_posts_response([create_post_dict_fixture, edit_post_dict_fixture], user_fixture)
+    assert response[1] == 201
+    assert [result['id'] for result in response[0]['results']] == [1, 2]
+    mock_create_posts.assert_called_once()
+
+def test_create_posts_response_partial(
+        mocker,
+        mock_create_posts,
+        mock_cache,
+        batch_post_list_fixture,
+        user_fixture):
+    mocker.patch('src.main.controllers.post_controller.get_batch_max_size', return_value=10)
+    response = create_posts_response(batch_post_list_fixture, user_fixture)
+    results = response[0]['results']
+    assert response[1] == 207
+    assert [result['status'] for result in results] == [201, 400, 201]
+    assert 'content' in results[1]['errors']
+
+def test_create_posts_response_too_large(
+        mock_batch_max_size,
+        batch_post_list_fixture,
+        user_fixture):
+    with pytest.raises(Exception) as e:
+        create_posts_response(batch_post_list_fixture, user_fixture)
+    assert e.value.code == 413
+    assert e.value.description == 'Too many posts in one batch.'
+
+def test_create_posts_response_unauthorized(batch_post_list_fixture):
+    with pytest.raises(Exception) as e:
+        create_posts_response(batch_post_list_fixture, None)
+    assert e.value.code == 401
+    assert e.value.description == 'Unauthorized.'
+
+def test_create_posts_response_exception(
+        mock_batch_max_size,
+        mock_create_posts_fail,
+        create_post_dict_fixture,
+        user_fixture):
+    with pytest.raises(Exception) as e:
+        create_posts_response([create_post_dict_fixture], user_fixture)
+    assert e.value.code == 500
+    assert e.value.description == 'An error occurred.'
+
+def test_create_posts_from_dicts_mysql(mock_mysql_insert_db, create_post_dict_fixture, user_fixture):
+    post_ids = create_posts_from_dicts([create_post_dict_fixture] * 3, user_fixture.id)
+    assert post_ids == [11, 13, 15]
+    # One multi-row INSERT, then the auto-increment step
+    assert mock_mysql_insert_db.session.execute.call_count == 2
+    mock_mysql_insert_db.session.commit.assert_called_once()
+
+def test_create_posts_from_dicts_row_by_row(mock_no_returning_insert_db, create_post_dict_fixture, user_fixture):
+    post_ids = create_posts_from_dicts([create_post_dict_fixture] * 2, user_fixture.id)
+    assert post_ids == [4, 9]
+    mock_no_returning_insert_db.session.commit.assert_called_once()
+
+# UPDATE POSTS
+def test_update_posts_response_success(
+        mock_batch_max_size,
+        mock_get_post_authors,
+        mock_update_posts,
+        mock_cache,
+        user_fixture):
+    response = update_posts_response([{'id': 1, 'title': 'New title'}, {'id': 2, 'content': 'New content'}], user_fixture)
+    assert response[1] == 200
+    assert [result['status'] for result in response[0]['results']] == [200, 200]
+    mock_get_post_authors.assert_called_once_with([1, 2])
+    mock_update_posts.assert_called_once_with(
+        [{'id': 1, 'title': 'New title'}, {'id': 2, 'content': 'New content'}],
+        user_fixture.id
+    )
+
+def test_update_posts_response_gone_meanwhile(
+        mock_batch_max_size,
+        mock_get_post_authors,
+        mock_update_posts_gone,
+        mock_cache,
+        user_fixture):
+    response = update_posts_response([{'id': 1, 'title': 'New title'}, {'id': 2, 'title': 'Gone'}], user_fixture)
+    assert response[1] == 207
+    assert [result['status'] for result in response[0]['results']] == [200, 404]
+    assert response[0]['results'][1]['errors'] == {'id': 'Post not found.'}
+
+def test_update_posts_response_partial(
+        mocker,
+        mock_get_post_authors,
+        mock_update_posts,
+        mock_cache,
+        user_fixture):
+    mocker.patch('src.main.controllers.post_controller.get_batch_max_size', return_value=10)
+    response = update_posts_response([
+        {'id': 1, 'title': 'New title'},
+        {'id': 3, 'title': 'Not mine'},
+        {'id': 4, 'title': 'Missing'},
+        {'id': 1, 'title': 'Again'},
+        {'id': 2},
+    ], user_fixture)
+    assert response[1] == 207
+    assert [result['status'] for result in response[0]['results']] == [200, 401, 404, 400, 400]
+    mock_update_posts.assert_called_once_with([{'id': 1, 'title': 'New title'}], user_fixture.id)
+
+def test_update_posts_from_dicts_checks_author_and_status(sqlite_app_fixture):
+    with sqlite_app_fixture.app_context():
+        for id, author_id, status in ((1, 5, STATUS_LIVE), (2, 5, STATUS_DELETED), (3, 6, STATUS_LIVE), (4, 5, STATUS_LIVE)):
+            db.session.add(Post(id=id, title='Title', author_id=author_id, content='content', status=status))
+        db.session.commit()
+        # Posts 2 and 3 were deleted or given away after the batch was authorized
+        updated = update_posts_from_dicts([
+            {'id': 1, 'title': 'New title'},
+            {'id': 2, 'title': 'New title'},
+            {'id': 3, 'title': 'New title'},
+            {'id': 4, 'content': 'New content'},
+        ], 5)
+        assert updated == [1, 4]
+        titles = dict(db.session.execute(select(Post.id, Post.title)).all())
+        assert titles == {1: 'New title', 2: 'Title', 3: 'Title', 4: 'Title'}
+        assert db.session.get(Post, 4).excerpt == 'New content'
+
+def test_update_posts_response_unauthorized():
+    with pytest.raises(Exception) as e:
+        update_posts_response([{'id': 1, 'title': 'New title'}], None)
+    assert e.value.code == 401
+    assert e.value.description == 'Unauthorized.'
+
+# DELETE POSTS
+def test_delete_posts_response_success(
+        mock_batch_max_size,
+        mock_get_post_authors,
+        mock_delete_posts,
+        mock_cache,
+        user_fixture):
+    response = delete_posts_response({'ids': [1, 2]}, user_fixture)
+    assert response[1] == 200
+    assert [result['status'] for result in response[0]['results']] == [204, 204]
+    mock_delete_posts.assert_called_once_with([1, 2], user_fixture.id)
+
+def test_delete_posts_response_none_allowed(
+        mock_batch_max_size,
+        mock_get_post_authors,
+        mock_delete_posts,
+        user_fixture):
+    response = delete_posts_response({'ids': [3, 4]}, user_fixture)
+    assert response[1] == 400
+    assert [result['status'] for result in response[0]['results']] == [401, 404]
+    mock_delete_posts.assert_not_called()
+
+def test_delete_posts_response_empty(user_fixture):
+    with pytest.raises(Exception) as e:
+        delete_posts_response({'ids': []}, user_fixture)
+    assert e.value.code == 400
+
+def test_delete_posts_response_exception(
+        mock_batch_max_size,
+        mock_get_post_authors,
+        mock_delete_posts_fail,
+        user_fixture):
+    with pytest.raises(Exception) as e:
+        delete_posts_response({'ids': [1]}, user_fixture)
+    assert e.value.code == 500
+    assert e.value.description == 'An error occurred.'
+
 # GET POST
-def test_get_post_response_success(mock_get_post, post_fixture):
+def test_get_post_response_success(mock_get_post_view, post_fixture):
     response = get_post_response(post_fixture.id)
     assert response[1] == 200
     assert response[0].title == post_fixture.title
 
-def test_get_post_response_not_found(mock_get_post_empty, post_fixture):
+def test_get_post_response_not_found(mock_get_post_view_empty, post_fixture):
     with pytest.raises(Exception) as e:
         get_post_response(post_fixture.id)
     assert e.value.code == 404
     assert e.value.description == 'Post not found.'
 
-def test_get_post_response_exception(mock_get_post_fail, post_fixture):
+def test_get_post_response_fields(mock_get_post_view, post_fixture):
+    response = get_post_response(post_fixture.id, 'id, title')
+    assert response[1] == 200
+
+def test_get_post_response_unknown_field(mock_get_post_view, post_fixture):
+    with pytest.raises(Exception) as e:
+        get_post_response(post_fixture.id, 'id,password_hash')
+    assert e.value.code == 400
+    assert e.value.description == 'Unknown field requested.'
+
+def test_get_post_response_exception(mock_get_post_view_fail, post_fixture):
     with pytest.raises(Exception) as e:
         get_post_response(post_fixture.id)
     assert e.value.code == 500
     assert e.value.description == 'An error occurred.'
 
+# FIELDS
+def test_parse_fields():
+    assert parse_fields('id, title,excerpt') == ('id', 'title', 'excerpt')
+    assert parse_fields('') is None
+
 # GET POSTS
 def test_get_posts_response_success(mock_get_posts, post_fixture):
     response = get_posts_response()
     assert response[1] == 200
-    assert response[0][0].title == post_fixture.title
+    assert response[0]['posts'][0].title == post_fixture.title
+    assert response[0]['next_cursor'] == 'next_page'
 
 def test_get_posts_response_not_found(mock_get_posts_empty):
     response = get_posts_response()
     assert response[1] == 204
-    assert response[0] == []
+    assert response[0]['posts'] == []
+    assert response[0]['next_cursor'] is None
+
+def test_get_posts_response_include_deleted_admin(mock_get_posts, user_fixture):
+    user_fixture.admin = True
+    response = get_posts_response(include_deleted=True, current_user=user_fixture)
+    assert response[1] == 200
+    mock_get_posts.assert_called_once_with(20, None, None, True)
+
+def test_get_posts_response_include_deleted_forbidden(mock_get_posts, user_fixture):
+    with pytest.raises(Exception) as e:
+        get_posts_response(include_deleted=True, current_user=user_fixture)
+    assert e.value.code == 403
+    assert e.value.description == 'User is not an admin.'
+    mock_get_posts.assert_not_called()
+
+def test_get_posts_response_bad_cursor(mock_get_posts_bad_cursor):
+    with pytest.raises(Exception) as e:
+        get_posts_response(cursor='not-a-cursor')
+    assert e.value.code == 400
+    assert e.value.description == 'Invalid cursor.'
 
 def test_get_posts_response_exception(mock_get_post_fail):
     with pytest.raises(Exception) as e:
@@ -88,16 +360,90 @@ def test_get_posts_response_exception(mock_get_post_fail):
     assert e.value.code == 500
     assert e.value.description == 'An error occurred.'
 
+# POST CHANGES
+def test_get_post_changes_response_success(mock_get_post_changes, post_fixture):
+    response = get_post_changes_response('since_token', 10)
+    changes = response[0]['changes']
+    assert response[1] == 200
+    assert response[0]['next_token'] == 'next_token'
+    assert not response[0]['has_more']
+    assert changes[0]['title'] == post_fixture.title
+    assert not changes[0]['deleted']
+    mock_get_post_changes.assert_called_once_with('since_token', 10, 5)
+
+def test_get_post_changes_response_tombstone(mock_get_post_changes):
+    tombstone = get_post_changes_response()[0]['changes'][1]
+    assert tombstone['deleted']
+    assert tombstone['status'] == 'deleted'
+    assert 'title' not in tombstone and 'content' not in tombstone
+
+def test_get_post_changes_response_exception(mock_get_post_changes_fail):
+    with pytest.raises(Exception) as e:
+        get_post_changes_response()
+    assert e.value.code == 500
+    assert e.value.description == 'An error occurred.'
+
+# SEARCH POSTS
+def test_search_posts_response_success(mock_search_posts, search_post_dict_fixture, post_fixture):
+    response = search_posts_response(search_post_dict_fixture)
+    assert response[1] == 200
+    assert response[0]['posts'][0].title == post_fixture.title
+
+def test_search_posts_response_not_found(mock_search_posts_empty, search_post_dict_fixture):
+    response = search_posts_response(search_post_dict_fixture)
+    assert response[1] == 204
+    assert response[0]['posts'] == []
+
+def test_search_posts_response_exception(mock_search_posts_fail, search_post_dict_fixture):
+    with pytest.raises(Exception) as e:
+        search_posts_response(search_post_dict_fixture)
+    assert e.value.code == 500
+    assert e.value.description == 'An error occurred.'
+
+# EXPORT POSTS
+def test_export_posts_response_success(request_context_fixture, mock_stream_posts, post_fixture):
+    response = export_posts_response('ndjson')
+    lines = b''.join(response.response).splitlines()
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert len(lines) == 2
+    assert json.loads(lines[0])['title'] == post_fixture.title
+
+def test_export_posts_response_include_deleted(request_context_fixture, mock_stream_posts):
+    export_posts_response('ndjson', True)
+    mock_stream_posts.assert_called_once_with(include_deleted=True)
+
+def test_export_statement():
+    statement = export_statement(100)
+    assert 'WHERE post.status = :status_1' in str(statement)
+    assert statement.get_execution_options()['stream_results']
+    assert statement.get_execution_options()['yield_per'] == 100
+    assert 'WHERE' not in str(export_statement(100, include_deleted=True))
+
+def test_export_posts_response_bad_format():
+    with pytest.raises(Exception) as e:
+        export_posts_response('xml')
+    assert e.value.code == 400
+    assert e.value.description == 'Unsupported export format.'
+
+def test_export_posts_response_exception(mock_stream_posts_fail):
+    with pytest.raises(Exception) as e:
+        export_posts_response('ndjson')
+    assert e.value.code == 500
+    assert e.value.description == 'An error occurred.'
+
 # GET USER POSTS
 def test_get_user_posts_response_success(mock_get_user_posts, post_fixture, user_fixture):
     response = get_user_posts_response(user_fixture.id)
+    page = json.loads(response[0])
     assert response[1] == 200
-    assert response[0][0].title == post_fixture.title
+    assert page['posts'][0]['title'] == post_fixture.title
+    assert page['next_cursor'] is None
 
 def test_get_user_posts_response_not_found(mock_get_user_posts_empty, user_fixture):
     response = get_user_posts_response(user_fixture.id)
     assert response[1] == 204
-    assert response[0] == []
+    assert response[0]['posts'] == []
 
 def test_get_user_posts_response_exception(mock_get_user_posts_fail, user_fixture):
     with pytest.raises(Exception) as e:
@@ -105,6 +451,67 @@ def test_get_user_posts_response_exception(mock_get_user_posts_fail, user_fixtur
     assert e.value.code == 500
     assert e.value.description == 'An error occurred.'
 
+# VERSIONS
+def test_get_post_version(mock_post_version_query, mock_replica_reads, post_fixture, updated_at_fixture):
+    version, last_modified = get_post_version(post_fixture.id)
+    assert version == '7:2024-04-10T10:10:35'
+    assert last_modified == updated_at_fixture
+
+def test_get_post_version_not_found(mock_post_version_query_empty, mock_replica_reads, post_fixture):
+    assert get_post_version(post_fixture.id) == (None, None)
+
+def test_get_user_posts_version(mock_post_version_query, mock_replica_reads, user_fixture, updated_at_fixture):
+    version, last_modified = get_user_posts_version(user_fixture.id)
+    assert version == '5:3:2024-04-10T10:10:35'
+    assert last_modified == updated_at_fixture
+
+def test_get_user_posts_version_no_posts(mock_post_version_query_empty, mock_replica_reads, user_fixture):
+    assert get_user_posts_version(user_fixture.id) == (None, None)
+
+def test_get_post_version_include_deleted_not_admin(mock_post_version_query, mock_replica_reads, post_fixture, user_fixture):
+    # Left to the view, which answers 403
+    assert get_post_version(post_fixture.id, True, Principal.from_user(user_fixture)) == (None, None)
+    assert get_user_posts_version(user_fixture.id, True, None) == (None, None)
+    mock_post_version_query.session.query.assert_not_called()
+
+# USER POSTS CACHE
+def test_get_user_posts_uses_generation(
+        mock_generation_cache,
+        mock_get_user_posts_page,
+        mock_replica_reads,
+        user_fixture):
+    get_user_posts(user_fixture.id, 10, None, None)
+    mock_replica_reads.assert_called_once_with(user_fixture.id)
+    mock_generation_cache.get.assert_called_once_with('user_posts_generation:5')
+    mock_get_user_posts_page.assert_called_once_with(user_fixture.id, 4, 10, None, None, False)
+
+def test_get_user_posts_page_encodes_payload(mock_fetch_user_posts, post_fixture, user_fixture):
+    payload = get_user_posts_page.uncached(user_fixture.id, 0, 10, None, ('id', 'title'))
+    assert json.loads(payload) == {
+        'posts': [{'id': str(post_fixture.id), 'title': post_fixture.title}],
+        'next_cursor': 'next_page'
+    }
+
+def test_get_user_posts_page_empty(mock_fetch_user_posts_empty, user_fixture):
+    assert get_user_posts_page.uncached(user_fixture.id, 0, 10, None, None) is None
+
+def test_get_user_posts_generation_missing(mock_generation_cache, user_fixture):
+    mock_generation_cache.get.side_effect = [None, 1712743835000000000]
+    assert get_user_posts_generation(user_fixture.id) == 1712743835000000000
+    key, generation = mock_generation_cache.add.call_args.args
+    assert key == 'user_posts_generation:5'
+    assert generation > 0
+    assert mock_generation_cache.add.call_args.kwargs == {'timeout': 0}
+
+def test_invalidate_user_posts(mock_generation_cache, user_fixture):
+    invalidate_user_posts(user_fixture.id)
+    key, generation = mock_generation_cache.set.call_args.args
+    assert key == 'user_posts_generation:5'
+    # Never expires, and never repeats an earlier generation
+    assert mock_generation_cache.set.call_args.kwargs == {'timeout': 0}
+    invalidate_user_posts(user_fixture.id)
+    assert mock_generation_cache.set.call_args.args[1] > generation
+
 # UPDATE POST
 def test_update_post_response_success(
         mock_get_post,
@@ -173,6 +580,21 @@ def test_delete_post_response_success(
     assert response[1] == 204
     assert response[0] == 'Post successfully deleted.'
 
+def test_delete_post_response_decrements_live_count(
+        mocker,
+        mock_get_post,
+        mock_cache,
+        post_fixture,
+        user_fixture):
+    update_db = mocker.patch('src.main.controllers.post_controller.update_db')
+    delete_post_response(post_fixture.id, user_fixture)
+    update_db.assert_called_once_with(post_fixture, live_post_count=-1)
+
+def test_live_delta():
+    assert live_delta('live', 'deleted') == -1
+    assert live_delta('deleted', 'live') == 1
+    assert live_delta('live', 'live') == 0
+
 def test_delete_post_response_unauthorized(mock_get_post, post_fixture, user_fixture):
     with pytest.raises(Exception) as e:
         post_fixture.author_id += 1
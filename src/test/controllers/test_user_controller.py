@@ -1,25 +1,44 @@
 import pytest
 
+from extensions import db
+from src.main.constants import STATUS_ACTIVE, STATUS_DELETED
+from src.main.models.user import User
 from src.main.controllers.user_controller import (
     create_user_response,
     delete_user_response,
+    get_principal_by_public_id,
+    get_user_view,
+    principal_generation_key,
     get_user_response,
     get_users_response,
+    import_users_response,
     update_user_response
 )
 from src.test.fixtures.user_fixtures import (
     create_user_dict_fixture,
     edit_user_dict_fixture,
+    import_result_fixture,
     mock_db,
     mock_db_conflict,
     mock_db_fail,
     mock_get_user,
     mock_get_user_empty,
     mock_get_user_fail,
+    mock_get_user_public_id,
+    mock_get_user_public_id_empty,
+    mock_get_user_view,
+    mock_get_user_view_empty,
+    mock_get_user_view_fail,
     mock_get_users,
     mock_get_users_empty,
-    user_fixture
+    mock_import_users,
+    mock_import_users_fail,
+    principal_cache_fixture,
+    shared_cache_fixture,
+    user_fixture,
+    user_view_fixture
 )
+from src.test.fixtures.app_fixtures import sqlite_app_fixture
 
 # CREATE USER
 def test_create_user_response_success(mock_db, create_user_dict_fixture, user_fixture):
@@ -39,19 +58,59 @@ def test_create_user_response_exception(mock_db_fail, create_user_dict_fixture):
     assert e.value.code == 500
     assert e.value.description == 'An error occurred.'
 
+## IMPORT USERS
+def test_import_users_response_partial(mock_import_users):
+    response = import_users_response(['username,email,password\n'])
+    assert response[1] == 207
+    assert response[0]['imported'] == 1
+    assert response[0]['errors'][0]['line'] == 3
+
+def test_import_users_response_success(mock_import_users, import_result_fixture):
+    import_result_fixture.update({'failed': 0, 'errors': []})
+    response = import_users_response(['username,email,password\n'])
+    assert response[1] == 201
+
+def test_import_users_response_none_imported(mock_import_users, import_result_fixture):
+    import_result_fixture['imported'] = 0
+    response = import_users_response(['username,email,password\n'])
+    assert response[1] == 400
+
+def test_import_users_response_empty(mock_import_users, import_result_fixture):
+    import_result_fixture.update({'imported': 0, 'failed': 0, 'errors': []})
+    with pytest.raises(Exception) as e:
+        import_users_response(['username,email,password\n'])
+    assert e.value.code == 400
+    assert e.value.description == 'No users to import.'
+
+def test_import_users_response_exception(mock_import_users_fail):
+    with pytest.raises(Exception) as e:
+        import_users_response(['username,email,password\n'])
+    assert e.value.code == 500
+    assert e.value.description == 'An error occurred.'
+
 ## GET USER
-def test_get_user_response_success(mock_get_user, user_fixture):
+def test_get_user_response_success(mock_get_user_view, user_fixture):
     response = get_user_response(user_fixture.id)
     assert response[1] == 200
     assert response[0].username == user_fixture.username
+    mock_get_user_view.assert_called_once_with(user_fixture.id, False)
+
+def test_get_user_view_hides_deleted_users(sqlite_app_fixture):
+    with sqlite_app_fixture.app_context():
+        db.session.add(User(id=5, username='active', email='active@test.email', status=STATUS_ACTIVE))
+        db.session.add(User(id=6, username='deleted', email='deleted@test.email', status=STATUS_DELETED))
+        db.session.commit()
+        assert get_user_view(5).username == 'active'
+        assert get_user_view(6) is None
+        assert get_user_view(6, include_deleted=True).username == 'deleted'
 
-def test_get_user_response_not_found(mock_get_user_empty, user_fixture):
+def test_get_user_response_not_found(mock_get_user_view_empty, user_fixture):
     with pytest.raises(Exception) as e:
         get_user_response(user_fixture.id)
     assert e.value.code == 404
     assert e.value.description == 'User not found.'
 
-def test_get_user_response_exception(mock_get_user_fail, user_fixture):
+def test_get_user_response_exception(mock_get_user_view_fail, user_fixture):
     with pytest.raises(Exception) as e:
         get_user_response(user_fixture.id)
     assert e.value.code == 500
@@ -74,6 +133,67 @@ def test_get_users_response_exception(mock_get_user_fail):
     assert e.value.code == 500
     assert e.value.description == 'An error occurred.'
 
+## PRINCIPALS
+def test_get_principal_by_public_id_caches(
+        principal_cache_fixture,
+        mock_get_user_public_id,
+        user_fixture):
+    principal = get_principal_by_public_id(user_fixture.public_id)
+    assert principal.id == user_fixture.id
+    assert principal.admin is False
+    assert get_principal_by_public_id(user_fixture.public_id) is principal
+    mock_get_user_public_id.assert_called_once_with(user_fixture.public_id)
+
+def test_get_principal_by_public_id_not_found(
+        principal_cache_fixture,
+        mock_get_user_public_id_empty):
+    assert get_principal_by_public_id('missing') is None
+    assert len(principal_cache_fixture) == 0
+
+def test_update_user_response_invalidates_principal(
+        principal_cache_fixture,
+        mock_get_user_public_id,
+        mock_get_user,
+        mock_db,
+        edit_user_dict_fixture,
+        user_fixture):
+    get_principal_by_public_id(user_fixture.public_id)
+    update_user_response(user_fixture.id, edit_user_dict_fixture, user_fixture)
+    assert principal_cache_fixture.get(user_fixture.public_id) is None
+
+def test_delete_user_response_invalidates_principal(
+        principal_cache_fixture,
+        mock_get_user_public_id,
+        mock_get_user,
+        mock_db,
+        user_fixture):
+    get_principal_by_public_id(user_fixture.public_id)
+    delete_user_response(user_fixture.id, user_fixture)
+    assert principal_cache_fixture.get(user_fixture.public_id) is None
+
+def test_principal_changed_by_another_worker(
+        principal_cache_fixture,
+        shared_cache_fixture,
+        mock_get_user_public_id,
+        user_fixture):
+    assert get_principal_by_public_id(user_fixture.public_id).admin is False
+    # Another worker makes the user an admin: its TTL cache is not this one, only the
+    # shared generation tells
+    user_fixture.admin = True
+    shared_cache_fixture.set(principal_generation_key(user_fixture.public_id), 1, timeout=0)
+    assert get_principal_by_public_id(user_fixture.public_id).admin is True
+    assert mock_get_user_public_id.call_count == 2
+
+def test_principal_not_trusted_after_generation_lost(
+        principal_cache_fixture,
+        shared_cache_fixture,
+        mock_get_user_public_id,
+        user_fixture):
+    get_principal_by_public_id(user_fixture.public_id)
+    shared_cache_fixture.delete(principal_generation_key(user_fixture.public_id))
+    get_principal_by_public_id(user_fixture.public_id)
+    assert mock_get_user_public_id.call_count == 2
+
 ## UPDATE USER
 def test_update_user_response_success(
         mock_get_user,
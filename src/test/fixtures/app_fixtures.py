@@ -0,0 +1,26 @@
+import config
+import pytest
+from app import create_app
+from extensions import db
+
+### APP ###
+@pytest.fixture
+def sqlite_app_fixture(request, monkeypatch, tmp_path):
+    '''App built by the factory on a throwaway SQLite file with its tables created, and an
+    in-memory cache. Parametrize it indirectly with a dict of other TestingConfig values.'''
+    overrides = {
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///{}'.format(tmp_path / 'app.db'),
+        'CACHE_TYPE': 'SimpleCache',
+    }
+    overrides.update(getattr(request, 'param', {}))
+    for name, value in overrides.items():
+        monkeypatch.setattr(config.TestingConfig, name, value, raising=False)
+    app = create_app()
+    with app.app_context():
+        # Not db.create_all(): other tests may have registered binds on the shared db
+        db.metadata.create_all(db.engine)
+    return app
+
+def app_config(**overrides):
+    '''Mark a test, or a module through pytestmark, to run on an app with these config values'''
+    return pytest.mark.parametrize('sqlite_app_fixture', [overrides], indirect=True, ids=[','.join(overrides)])
@@ -1,6 +1,7 @@
 import pytest
 
 from unittest.mock import Mock
+from src.main.hashing import HashingPoolBusy
 from src.test.fixtures.user_fixtures import user_fixture
 
 @pytest.fixture
@@ -54,3 +55,20 @@ def mock_check_password_fail(mocker):
     mock = Mock()
     mocker.patch('src.main.models.user.User.authenticate', return_value=False)
     return mock
+
+@pytest.fixture
+def mock_check_password_busy(mocker):
+    '''Mock a full password hashing queue'''
+    mock = Mock()
+    mocker.patch(
+        'src.main.models.user.User.authenticate',
+        side_effect=HashingPoolBusy('Mocked error')
+    )
+    return mock
+
+@pytest.fixture
+def mock_needs_rehash(mocker):
+    '''Mock a stored hash with an outdated bcrypt cost'''
+    mocker.patch('src.main.models.user.User.needs_rehash', return_value=True)
+    mocker.patch('src.main.models.user.hasher.hash', return_value='$2b$04$rehashed')
+    return mocker.patch('src.main.controllers.auth_controller.update_db')
@@ -1,9 +1,16 @@
 import pytest
 
-from src.main.constants import STATUS_LIVE
+from collections import namedtuple
+from contextlib import nullcontext
+from datetime import datetime
+from flask import Flask
+from src.main.constants import STATUS_DELETED, STATUS_LIVE
+from src.main.controllers.post_controller import encode_page
 from src.main.models.post import Post
+from src.main.models.post_view import PostView
 from unittest.mock import Mock
 from sqlalchemy.exc import IntegrityError
+from werkzeug.exceptions import BadRequest
 from src.test.fixtures.user_fixtures import user_fixture
 
 ### POST ###
@@ -18,6 +25,19 @@ def post_fixture(user_fixture):
         status=STATUS_LIVE    
     )
 
+@pytest.fixture
+def post_view_fixture(post_fixture):
+    '''Read model of the basic post'''
+    return PostView(
+        id=post_fixture.id,
+        author_id=post_fixture.author_id,
+        title=post_fixture.title,
+        content=post_fixture.content,
+        excerpt=post_fixture.excerpt,
+        status=post_fixture.status,
+        created_at=datetime(2024, 4, 10, 10, 10, 35)
+    )
+
 @pytest.fixture
 def create_post_dict_fixture():
     '''Input to create new post'''
@@ -86,31 +106,60 @@ def mock_get_post_empty(mocker):
     return mock
 
 @pytest.fixture
-def mock_get_posts(mocker, post_fixture):
-    '''Mock fetching posts from db'''
+def mock_get_post_view(mocker, post_view_fixture):
+    '''Mock reading a post for display'''
+    return mocker.patch(
+        'src.main.controllers.post_controller.get_post_view',
+        return_value=post_view_fixture
+    )
+
+@pytest.fixture
+def mock_get_post_view_fail(mocker):
+    '''Mock an error reading a post for display'''
+    mock = Mock()
+    mocker.patch(
+        'src.main.controllers.post_controller.get_post_view',
+        side_effect=Exception('Mocked error')
+    )
+    return mock
+
+@pytest.fixture
+def mock_get_post_view_empty(mocker):
+    '''Mock reading no post for display'''
     mock = Mock()
-    mocker.patch('src.main.controllers.post_controller.get_posts', return_value=[post_fixture])
+    mocker.patch('src.main.controllers.post_controller.get_post_view', return_value=None)
     return mock
 
+@pytest.fixture
+def mock_get_posts(mocker, post_fixture):
+    '''Mock fetching posts from db'''
+    return mocker.patch(
+        'src.main.controllers.post_controller.get_posts',
+        return_value=([post_fixture], 'next_page')
+    )
+
 @pytest.fixture
 def mock_get_posts_empty(mocker):
     '''Mock fetching no posts from db'''
     mock = Mock()
-    mocker.patch('src.main.controllers.post_controller.get_posts', return_value=[])
+    mocker.patch('src.main.controllers.post_controller.get_posts', return_value=([], None))
     return mock
 
 @pytest.fixture
 def mock_get_user_posts(mocker, post_fixture):
     '''Mock fetching posts from db'''
     mock = Mock()
-    mocker.patch('src.main.controllers.post_controller.get_user_posts', return_value=[post_fixture])
+    mocker.patch(
+        'src.main.controllers.post_controller.get_user_posts',
+        return_value=encode_page([post_fixture], None, None)
+    )
     return mock
 
 @pytest.fixture
 def mock_get_user_posts_empty(mocker):
     '''Mock fetching no posts from db'''
     mock = Mock()
-    mocker.patch('src.main.controllers.post_controller.get_user_posts', return_value=[])
+    mocker.patch('src.main.controllers.post_controller.get_user_posts', return_value=None)
     return mock
 
 @pytest.fixture
@@ -123,9 +172,272 @@ def mock_get_user_posts_fail(mocker):
     )
     return mock
 
+@pytest.fixture
+def mock_get_posts_bad_cursor(mocker):
+    '''Mock fetching posts with an undecodable cursor'''
+    mock = Mock()
+    mocker.patch(
+        'src.main.controllers.post_controller.get_posts',
+        side_effect=BadRequest('Invalid cursor.')
+    )
+    return mock
+
 @pytest.fixture
 def mock_cache(mocker):
     '''Mock caching functionality'''
     mock = Mock()
     mocker.patch('src.main.controllers.post_controller.cache')
     return mock
+
+@pytest.fixture
+def request_context_fixture():
+    '''Bare request context for streamed responses'''
+    with Flask(__name__).test_request_context() as context:
+        yield context
+
+@pytest.fixture
+def mock_stream_posts(mocker, post_fixture):
+    '''Mock streaming post rows from db in partitions'''
+    row = (
+        post_fixture.id,
+        post_fixture.author_id,
+        post_fixture.title,
+        post_fixture.content,
+        post_fixture.excerpt,
+        post_fixture.status
+    )
+    mock = Mock()
+    mock.partitions.return_value = iter([[row], [row]])
+    return mocker.patch('src.main.controllers.post_controller.stream_posts', return_value=mock)
+
+@pytest.fixture
+def mock_stream_posts_fail(mocker):
+    '''Mock an error streaming posts from db'''
+    mock = Mock()
+    mocker.patch(
+        'src.main.controllers.post_controller.stream_posts',
+        side_effect=Exception('Mocked error')
+    )
+    return mock
+
+@pytest.fixture
+def search_post_dict_fixture():
+    '''Input to search posts'''
+    return {
+        'query': 'exciting content',
+        'limit': 10
+    }
+
+@pytest.fixture
+def mock_search_posts(mocker, post_fixture):
+    '''Mock searching posts in the full-text index'''
+    mock = Mock()
+    mocker.patch(
+        'src.main.controllers.post_controller.search_posts',
+        return_value=([post_fixture], None)
+    )
+    return mock
+
+@pytest.fixture
+def mock_search_posts_empty(mocker):
+    '''Mock a search with no matches'''
+    mock = Mock()
+    mocker.patch('src.main.controllers.post_controller.search_posts', return_value=([], None))
+    return mock
+
+@pytest.fixture
+def mock_search_posts_fail(mocker):
+    '''Mock an error searching posts'''
+    mock = Mock()
+    mocker.patch(
+        'src.main.controllers.post_controller.search_posts',
+        side_effect=Exception('Mocked error')
+    )
+    return mock
+
+@pytest.fixture
+def updated_at_fixture():
+    '''Last write time of a post'''
+    return datetime(2024, 4, 10, 10, 10, 35)
+
+@pytest.fixture
+def mock_post_version_query(mocker, updated_at_fixture):
+    '''Mock the session query for post versions'''
+    mock = mocker.patch('src.main.controllers.post_controller.db')
+    query = mock.session.query.return_value.filter.return_value.filter_by.return_value
+    query.scalar.return_value = updated_at_fixture
+    query.one.return_value = (3, updated_at_fixture)
+    return mock
+
+@pytest.fixture
+def mock_post_version_query_empty(mocker):
+    '''Mock the session query for versions of missing posts'''
+    mock = mocker.patch('src.main.controllers.post_controller.db')
+    query = mock.session.query.return_value.filter.return_value.filter_by.return_value
+    query.scalar.return_value = None
+    query.one.return_value = (0, None)
+    return mock
+
+@pytest.fixture
+def mock_generation_cache(mocker):
+    '''Mock the shared cache holding per-author generations'''
+    mock = mocker.patch('src.main.controllers.post_controller.cache')
+    mock.get.return_value = 4
+    return mock
+
+@pytest.fixture
+def mock_get_user_posts_page(mocker, post_fixture):
+    '''Mock fetching a memoized page of an author's posts'''
+    return mocker.patch(
+        'src.main.controllers.post_controller.get_user_posts_page',
+        return_value=encode_page([post_fixture], None, None)
+    )
+
+@pytest.fixture
+def mock_fetch_user_posts(mocker, post_fixture):
+    '''Mock fetching a page of an author's posts from db'''
+    mock = Mock()
+    mocker.patch(
+        'src.main.controllers.post_controller.fetch_user_posts',
+        return_value=([post_fixture], 'next_page')
+    )
+    return mock
+
+@pytest.fixture
+def mock_fetch_user_posts_empty(mocker):
+    '''Mock fetching no posts of an author from db'''
+    mock = Mock()
+    mocker.patch('src.main.controllers.post_controller.fetch_user_posts', return_value=([], None))
+    return mock
+
+@pytest.fixture
+def batch_post_list_fixture(create_post_dict_fixture, edit_post_dict_fixture):
+    '''Input to create several posts, one of them invalid'''
+    return [create_post_dict_fixture, {'title': 'No content'}, edit_post_dict_fixture]
+
+@pytest.fixture
+def mock_batch_max_size(mocker):
+    '''Batch size limit without app context'''
+    mock = Mock()
+    mocker.patch('src.main.controllers.post_controller.get_batch_max_size', return_value=2)
+    return mock
+
+@pytest.fixture
+def mock_create_posts(mocker):
+    '''Mock a successful batch insert'''
+    return mocker.patch(
+        'src.main.controllers.post_controller.create_posts_from_dicts',
+        side_effect=lambda inputs, author_id: list(range(1, len(inputs) + 1))
+    )
+
+@pytest.fixture
+def mock_insert_db(mocker):
+    '''Mock the session of a batch insert, and the search index it feeds'''
+    mocker.patch('src.main.controllers.post_controller.index_post_rows')
+    mocker.patch('src.main.controllers.post_controller.adjust_post_counts')
+    return mocker.patch('src.main.controllers.post_controller.db')
+
+@pytest.fixture
+def mock_mysql_insert_db(mock_insert_db):
+    '''MySQL: no RETURNING, the first id of a multi-row insert, ids two apart'''
+    dialect = mock_insert_db.session.get_bind.return_value.dialect
+    dialect.insert_executemany_returning = False
+    dialect.name = 'mysql'
+    mock_insert_db.session.execute.side_effect = [Mock(lastrowid=11), Mock(**{'scalar.return_value': 2})]
+    return mock_insert_db
+
+@pytest.fixture
+def mock_no_returning_insert_db(mock_insert_db):
+    '''Another database without RETURNING, inserted one row at a time'''
+    dialect = mock_insert_db.session.get_bind.return_value.dialect
+    dialect.insert_executemany_returning = False
+    dialect.name = 'other'
+    mock_insert_db.session.execute.side_effect = [Mock(inserted_primary_key=(id,)) for id in (4, 9)]
+    return mock_insert_db
+
+@pytest.fixture
+def mock_create_posts_fail(mocker):
+    '''Mock a failed batch insert'''
+    mock = Mock()
+    mocker.patch(
+        'src.main.controllers.post_controller.create_posts_from_dicts',
+        side_effect=Exception('Mocked error')
+    )
+    return mock
+
+@pytest.fixture
+def mock_get_post_authors(mocker, user_fixture):
+    '''Posts 1 and 2 belong to the test user, post 3 to someone else'''
+    return mocker.patch(
+        'src.main.controllers.post_controller.get_post_authors',
+        return_value={1: user_fixture.id, 2: user_fixture.id, 3: user_fixture.id + 1}
+    )
+
+@pytest.fixture
+def mock_update_posts(mocker):
+    '''Mock a successful bulk update'''
+    return mocker.patch(
+        'src.main.controllers.post_controller.update_posts_from_dicts',
+        side_effect=lambda inputs, author_id: [input['id'] for input in inputs]
+    )
+
+@pytest.fixture
+def mock_update_posts_gone(mocker):
+    '''Mock a bulk update that found post 2 deleted after the batch was authorized'''
+    return mocker.patch(
+        'src.main.controllers.post_controller.update_posts_from_dicts',
+        side_effect=lambda inputs, author_id: [input['id'] for input in inputs if input['id'] != 2]
+    )
+
+@pytest.fixture
+def mock_delete_posts(mocker):
+    '''Mock a successful bulk soft delete'''
+    return mocker.patch('src.main.controllers.post_controller.delete_posts_by_ids')
+
+@pytest.fixture
+def mock_delete_posts_fail(mocker):
+    '''Mock a failed bulk soft delete'''
+    mock = Mock()
+    mocker.patch(
+        'src.main.controllers.post_controller.delete_posts_by_ids',
+        side_effect=Exception('Mocked error')
+    )
+    return mock
+
+@pytest.fixture
+def post_change_rows_fixture(post_fixture):
+    '''A live and a deleted post as returned by the change feed query'''
+    Row = namedtuple('Row', ['id', 'author_id', 'title', 'content', 'excerpt', 'status', 'updated_at'])
+    updated_at = datetime(2024, 4, 10, 10, 10, 35)
+    return [
+        Row(post_fixture.id, post_fixture.author_id, post_fixture.title, post_fixture.content, None, STATUS_LIVE, updated_at),
+        Row(8, post_fixture.author_id, 'Gone', 'Gone content', 'Gone content', STATUS_DELETED, updated_at),
+    ]
+
+@pytest.fixture
+def mock_get_post_changes(mocker, post_change_rows_fixture):
+    '''Mock reading the change feed'''
+    mocker.patch('src.main.controllers.post_controller.get_changes_settle_seconds', return_value=5)
+    return mocker.patch(
+        'src.main.controllers.post_controller.get_post_changes',
+        return_value=(post_change_rows_fixture, 'next_token', False)
+    )
+
+@pytest.fixture
+def mock_get_post_changes_fail(mocker):
+    '''Mock a failed change feed read'''
+    mock = Mock()
+    mocker.patch('src.main.controllers.post_controller.get_changes_settle_seconds', return_value=5)
+    mocker.patch(
+        'src.main.controllers.post_controller.get_post_changes',
+        side_effect=Exception('Mocked error')
+    )
+    return mock
+
+@pytest.fixture
+def mock_replica_reads(mocker):
+    '''Run replica-routed reads without an app'''
+    return mocker.patch(
+        'src.main.controllers.post_controller.replica_reads',
+        side_effect=lambda *user_ids: nullcontext()
+    )
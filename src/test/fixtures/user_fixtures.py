@@ -1,6 +1,9 @@
 import pytest
+from cachelib import SimpleCache
 from src.main.constants import STATUS_ACTIVE
 from src.main.models.user import User
+from src.main.models.user_view import UserView
+from src.main.ttl_cache import TTLCache
 from unittest.mock import Mock
 from sqlalchemy.exc import IntegrityError
 
@@ -16,6 +19,17 @@ def user_fixture():
         status=STATUS_ACTIVE    
     )
 
+@pytest.fixture
+def user_view_fixture(user_fixture):
+    '''Read model of the basic user'''
+    return UserView(
+        id=user_fixture.id,
+        username=user_fixture.username,
+        email=user_fixture.email,
+        post_count=2,
+        live_post_count=1
+    )
+
 @pytest.fixture
 def create_user_dict_fixture():
     '''Input to create new user'''
@@ -85,10 +99,35 @@ def mock_get_user_empty(mocker):
     return mock
 
 @pytest.fixture
-def mock_get_users(mocker, user_fixture):
+def mock_get_user_view(mocker, user_view_fixture):
+    '''Mock reading a user for display'''
+    return mocker.patch(
+        'src.main.controllers.user_controller.get_user_view',
+        return_value=user_view_fixture
+    )
+
+@pytest.fixture
+def mock_get_user_view_fail(mocker):
+    '''Mock an error reading a user for display'''
+    mock = Mock()
+    mocker.patch(
+        'src.main.controllers.user_controller.get_user_view',
+        side_effect=Exception('Mocked error')
+    )
+    return mock
+
+@pytest.fixture
+def mock_get_user_view_empty(mocker):
+    '''Mock reading no user for display'''
+    mock = Mock()
+    mocker.patch('src.main.controllers.user_controller.get_user_view', return_value=None)
+    return mock
+
+@pytest.fixture
+def mock_get_users(mocker, user_view_fixture):
     '''Mock fetching users from db'''
     mock = Mock()
-    mocker.patch('src.main.controllers.user_controller.get_users', return_value=[user_fixture])
+    mocker.patch('src.main.controllers.user_controller.get_users', return_value=[user_view_fixture])
     return mock
 
 @pytest.fixture
@@ -97,3 +136,60 @@ def mock_get_users_empty(mocker):
     mock = Mock()
     mocker.patch('src.main.controllers.user_controller.get_users', return_value=[])
     return mock
+
+@pytest.fixture
+def shared_cache_fixture(mocker):
+    '''Empty stand-in for the cache every worker shares'''
+    cache = SimpleCache()
+    mocker.patch('src.main.controllers.user_controller.cache', cache)
+    return cache
+
+@pytest.fixture
+def principal_cache_fixture(mocker, shared_cache_fixture):
+    '''Empty principal cache'''
+    cache = TTLCache()
+    mocker.patch('src.main.controllers.user_controller.principal_cache', cache)
+    return cache
+
+@pytest.fixture
+def mock_get_user_public_id(mocker, user_fixture):
+    '''Mock fetching a user by public id from db'''
+    return mocker.patch(
+        'src.main.controllers.user_controller.get_user_by_public_id',
+        return_value=user_fixture
+    )
+
+@pytest.fixture
+def mock_get_user_public_id_empty(mocker):
+    '''Mock fetching no user by public id from db'''
+    return mocker.patch(
+        'src.main.controllers.user_controller.get_user_by_public_id',
+        return_value=None
+    )
+
+@pytest.fixture
+def import_result_fixture():
+    '''Outcome of a CSV import with one rejected row'''
+    return {
+        'imported': 1,
+        'failed': 1,
+        'errors': [{'line': 3, 'username': 'user', 'email': 'user@email.com', 'errors': {'username': 'Duplicate username in file.'}}]
+    }
+
+@pytest.fixture
+def mock_import_users(mocker, import_result_fixture):
+    '''Mock a CSV import'''
+    return mocker.patch(
+        'src.main.controllers.user_controller.import_users',
+        return_value=import_result_fixture
+    )
+
+@pytest.fixture
+def mock_import_users_fail(mocker):
+    '''Mock a failed CSV import'''
+    mock = Mock()
+    mocker.patch(
+        'src.main.controllers.user_controller.import_users',
+        side_effect=Exception('Mocked error')
+    )
+    return mock
@@ -0,0 +1,42 @@
+from app import reset_after_fork
+from extensions import db, pool_metrics
+from src.main.pool_metrics import InstrumentedQueuePool
+from src.test.fixtures.app_fixtures import app_config, sqlite_app_fixture
+
+def test_swagger_spec_built_on_first_request(sqlite_app_fixture):
+    from api import api
+    # The Api is shared by every app, forget a spec built by an earlier test
+    api.__dict__.pop('__schema__', None)
+    api._schema = None
+    sqlite_app_fixture.test_client().get('/')
+    assert api._schema is None
+    assert sqlite_app_fixture.test_client().get('/api/v1/swagger.json').status_code == 200
+    assert api._schema is not None
+
+def test_reset_after_fork_drops_inherited_connections(sqlite_app_fixture):
+    app = sqlite_app_fixture
+    with app.app_context():
+        db.engine.dispose()
+        with db.engine.connect():
+            pass
+        pool = db.engine.pool
+        assert pool.checkedin() == 1
+    reset_after_fork(app)
+    with app.app_context():
+        # A fresh pool, so the worker opens its own connections
+        assert db.engine.pool is not pool
+        assert db.engine.pool.checkedin() == 0
+    stats, = pool_metrics.snapshot()
+    assert stats['connects'] == 0
+    assert stats['checkouts'] == 0
+
+@app_config(SQLALCHEMY_DATABASE_URI='sqlite://')
+def test_in_memory_sqlite(sqlite_app_fixture):
+    with sqlite_app_fixture.app_context():
+        assert not isinstance(db.engine.pool, InstrumentedQueuePool)
+    stats, = pool_metrics.snapshot()
+    assert 'size' not in stats
+
+def test_file_sqlite_pool_instrumented(sqlite_app_fixture):
+    with sqlite_app_fixture.app_context():
+        assert isinstance(db.engine.pool, InstrumentedQueuePool)
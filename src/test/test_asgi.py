@@ -0,0 +1,97 @@
+import asyncio
+import json
+import pytest
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from extensions import db
+from src.main.constants import STATUS_DELETED, STATUS_LIVE
+from src.main.views.asgi_routing import AsgiApp
+
+INSERT_POST = text(
+    'INSERT INTO post (id, title, author_id, content, status, created_at, updated_at) '
+    "VALUES (:id, :title, 5, 'content', :status, :created_at, '2024-04-10 10:10:35')"
+)
+
+@pytest.fixture
+def asgi_app_fixture(tmp_path):
+    '''ASGI app on a SQLite file holding two live posts and a deleted one'''
+    path = tmp_path / 'asgi.db'
+    engine = create_engine('sqlite:///{}'.format(path))
+    db.metadata.create_all(engine)
+    with engine.begin() as connection:
+        for id, status in ((1, STATUS_LIVE), (2, STATUS_DELETED), (3, STATUS_LIVE)):
+            connection.execute(INSERT_POST, {
+                'id': id,
+                'title': 'Post {}'.format(id),
+                'status': status,
+                'created_at': '2024-04-10 10:10:3{}'.format(id)
+            })
+    engine.dispose()
+    app = AsgiApp(create_async_engine('sqlite+aiosqlite:///{}'.format(path)), 'my_secret')
+    yield app
+    asyncio.run(app.engine.dispose())
+
+def get(app, path: str, query: str = '', method: str = 'GET'):
+    '''Run one request through the app, returning (status, decoded body)'''
+    messages = []
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query.encode('utf-8'),
+        'headers': []
+    }
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+    async def send(message):
+        messages.append(message)
+    asyncio.run(app(scope, receive, send))
+    body = messages[1]['body']
+    return messages[0]['status'], json.loads(body) if body else None
+
+def test_get_posts_hides_deleted(asgi_app_fixture):
+    code, page = get(asgi_app_fixture, '/api/v1/post/')
+    assert code == 200
+    assert [post['id'] for post in page['posts']] == ['1', '3']
+    assert page['next_cursor'] is None
+
+def test_get_posts_pages_with_cursor(asgi_app_fixture):
+    code, page = get(asgi_app_fixture, '/api/v1/post/', 'limit=1&fields=id,title')
+    assert code == 200
+    assert page['posts'] == [{'id': '1', 'title': 'Post 1'}]
+    code, page = get(asgi_app_fixture, '/api/v1/post/', 'limit=1&cursor=' + page['next_cursor'])
+    assert [post['id'] for post in page['posts']] == ['3']
+
+def test_get_post(asgi_app_fixture):
+    code, post = get(asgi_app_fixture, '/api/v1/post/1', 'fields=title')
+    assert code == 200
+    assert post == {'title': 'Post 1'}
+
+def test_get_deleted_post(asgi_app_fixture):
+    code, body = get(asgi_app_fixture, '/api/v1/post/2')
+    assert code == 404
+    assert body == {'message': 'Post not found.'}
+
+def test_get_user_posts(asgi_app_fixture):
+    code, page = get(asgi_app_fixture, '/api/v1/user/5/posts')
+    assert code == 200
+    assert len(page['posts']) == 2
+    code, body = get(asgi_app_fixture, '/api/v1/user/6/posts')
+    assert code == 204
+    assert body is None
+
+def test_include_deleted_needs_admin(asgi_app_fixture):
+    code, body = get(asgi_app_fixture, '/api/v1/post/', 'include_deleted=true')
+    assert code == 403
+    assert body == {'message': 'User is not an admin.'}
+
+@pytest.mark.parametrize('query', ['fields=password', 'cursor=nope', 'limit=ten'])
+def test_get_posts_bad_input(asgi_app_fixture, query):
+    code, _ = get(asgi_app_fixture, '/api/v1/post/', query)
+    assert code == 400
+
+def test_writes_are_not_served(asgi_app_fixture):
+    assert get(asgi_app_fixture, '/api/v1/post/', method='POST')[0] == 405
+    assert get(asgi_app_fixture, '/api/v1/post/search')[0] == 404
@@ -0,0 +1,62 @@
+import jwt
+import pytest
+from sqlalchemy import text
+from extensions import db
+from src.main.constants import STATUS_ACTIVE, STATUS_DELETED, STATUS_LIVE
+from src.test.fixtures.app_fixtures import sqlite_app_fixture
+
+FUTURE = 'Thu, 01 Jan 2099 00:00:00 GMT'
+
+INSERT_POST = text(
+    'INSERT INTO post (id, title, author_id, content, status, created_at, updated_at) '
+    "VALUES (:id, 'Title', 5, 'content', :status, '2024-04-10 10:10:35', :updated_at)"
+)
+
+@pytest.fixture
+def conditional_app_fixture(sqlite_app_fixture):
+    '''App holding a live post, a soft-deleted one and an admin'''
+    app = sqlite_app_fixture
+    with app.app_context():
+        db.session.execute(text(
+            'INSERT INTO user (id, public_id, username, email, admin, status, created_at, updated_at) '
+            "VALUES (1, 'admin-id', 'admin', 'admin@blog.test', 1, :status, "
+            "'2024-04-10 10:10:35', '2024-04-10 10:10:35')"
+        ), {'status': STATUS_ACTIVE})
+        db.session.execute(INSERT_POST, {'id': 1, 'status': STATUS_LIVE, 'updated_at': '2024-04-10 10:10:35'})
+        db.session.execute(INSERT_POST, {'id': 2, 'status': STATUS_DELETED, 'updated_at': '2024-04-11 10:10:35'})
+        db.session.commit()
+    return app
+
+def admin_headers(app) -> dict:
+    return {'Authorization': jwt.encode({'public_id': 'admin-id'}, app.config['SECRET_KEY'], algorithm='HS256')}
+
+def test_conditional_get_of_live_post(conditional_app_fixture):
+    response = conditional_app_fixture.test_client().get('/api/v1/post/1', headers={'If-Modified-Since': FUTURE})
+    assert response.status_code == 304
+    assert response.headers['ETag']
+
+def test_conditional_get_of_deleted_post(conditional_app_fixture):
+    client = conditional_app_fixture.test_client()
+    response = client.get('/api/v1/post/2', headers={'If-Modified-Since': FUTURE})
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
+    assert 'Last-Modified' not in response.headers
+    response = client.get('/api/v1/post/2?include_deleted=true', headers={'If-Modified-Since': FUTURE})
+    assert response.status_code == 403
+
+def test_conditional_get_of_deleted_post_by_admin(conditional_app_fixture):
+    headers = dict(admin_headers(conditional_app_fixture), **{'If-Modified-Since': FUTURE})
+    response = conditional_app_fixture.test_client().get('/api/v1/post/2?include_deleted=true', headers=headers)
+    assert response.status_code == 304
+
+def test_user_posts_version_ignores_deleted_posts(conditional_app_fixture):
+    client = conditional_app_fixture.test_client()
+    # Only the live post, changed on the 10th, counts; the deleted one changed on the 11th
+    response = client.get('/api/v1/user/5/posts', headers={'If-Modified-Since': 'Wed, 10 Apr 2024 12:00:00 GMT'})
+    assert response.status_code == 304
+    etag = response.headers['ETag']
+    with conditional_app_fixture.app_context():
+        db.session.execute(text("UPDATE post SET title = 'Edited', updated_at = '2024-04-12 10:10:35' WHERE id = 2"))
+        db.session.commit()
+    response = client.get('/api/v1/user/5/posts', headers={'If-None-Match': etag})
+    assert response.status_code == 304
@@ -0,0 +1,34 @@
+import pytest
+
+from flask_bcrypt import Bcrypt
+from src.main.hashing import hash_password, HashingPoolBusy, PasswordHasher
+
+@pytest.fixture
+def hasher_fixture():
+    '''Cheap hasher for testing'''
+    hasher = PasswordHasher(Bcrypt(), log_rounds=4, pool_size=1, max_pending=2)
+    yield hasher
+    hasher.shutdown()
+
+def test_hash_and_check(hasher_fixture):
+    password_hash = hasher_fixture.hash('very_secure_password')
+    assert hasher_fixture.check(password_hash, 'very_secure_password')
+    assert not hasher_fixture.check(password_hash, 'wrong_password')
+    assert hasher_fixture.queue_depth == 0
+
+def test_needs_rehash(hasher_fixture):
+    password_hash = hasher_fixture.hash('very_secure_password')
+    assert not hasher_fixture.needs_rehash(password_hash)
+    hasher_fixture.log_rounds = 5
+    assert hasher_fixture.needs_rehash(password_hash)
+    assert not hasher_fixture.needs_rehash(None)
+
+def test_hash_pool_busy():
+    hasher = PasswordHasher(Bcrypt(), log_rounds=4, max_pending=0)
+    with pytest.raises(HashingPoolBusy):
+        hasher.hash('very_secure_password')
+
+def test_hash_password_matches_hasher(hasher_fixture):
+    password_hash = hash_password('very_secure_password', 4)
+    assert hasher_fixture.check(password_hash, 'very_secure_password')
+    assert not hasher_fixture.needs_rehash(password_hash)
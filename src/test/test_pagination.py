@@ -0,0 +1,25 @@
+import pytest
+
+from datetime import datetime
+from src.main.constants import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from src.main.pagination import (
+    clamp_limit,
+    decode_keyset_cursor,
+    encode_keyset_cursor
+)
+
+def test_keyset_cursor_round_trip():
+    created_at = datetime(2024, 4, 10, 10, 10, 35)
+    cursor = encode_keyset_cursor(created_at, 7)
+    assert decode_keyset_cursor(cursor) == (created_at, 7)
+
+def test_keyset_cursor_invalid():
+    with pytest.raises(Exception) as e:
+        decode_keyset_cursor('not-a-cursor')
+    assert e.value.code == 400
+    assert e.value.description == 'Invalid cursor.'
+
+def test_clamp_limit():
+    assert clamp_limit(None) == DEFAULT_PAGE_SIZE
+    assert clamp_limit(-5) == 1
+    assert clamp_limit(MAX_PAGE_SIZE + 1) == MAX_PAGE_SIZE
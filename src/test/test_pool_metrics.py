@@ -0,0 +1,74 @@
+import pytest
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from flask import Flask
+from extensions import db
+from src.main.pool_metrics import InstrumentedQueuePool, PoolMetrics
+
+@pytest.fixture
+def engine_fixture(tmp_path):
+    '''File database on a tiny instrumented pool'''
+    engine = create_engine(
+        'sqlite:///{}'.format(tmp_path / 'pool.db'),
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=1,
+        pool_timeout=0.01
+    )
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def metrics_fixture(engine_fixture):
+    return PoolMetrics().track(engine_fixture)
+
+def test_pool_metrics_checkouts(engine_fixture, metrics_fixture):
+    with engine_fixture.connect():
+        stats = metrics_fixture.snapshot()
+        assert stats['checked_out'] == 1
+        assert stats['size'] == 1
+    stats = metrics_fixture.snapshot()
+    assert stats['connects'] == 1
+    assert stats['checkouts'] == stats['checkins'] == 1
+    assert stats['checked_out'] == 0
+
+def test_pool_metrics_overflow_and_timeout(engine_fixture, metrics_fixture):
+    first = engine_fixture.connect()
+    second = engine_fixture.connect()
+    assert metrics_fixture.snapshot()['overflow'] == 1
+    with pytest.raises(PoolTimeoutError):
+        engine_fixture.connect()
+    stats = metrics_fixture.snapshot()
+    assert stats['timeouts'] == 1
+    assert stats['wait_seconds_max'] >= 0.01
+    first.close()
+    second.close()
+
+def test_pool_metrics_survive_dispose(engine_fixture, metrics_fixture):
+    engine_fixture.dispose()
+    with engine_fixture.connect():
+        pass
+    assert engine_fixture.pool.metrics is metrics_fixture
+    assert metrics_fixture.snapshot()['checkouts'] == 1
+
+def test_pool_metrics_per_bind(tmp_path):
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI='sqlite:///{}'.format(tmp_path / 'primary.db'),
+        SQLALCHEMY_BINDS={'replica': 'sqlite:///{}'.format(tmp_path / 'replica.db')},
+        SQLALCHEMY_ENGINE_OPTIONS={'poolclass': InstrumentedQueuePool}
+    )
+    db.init_app(app)
+    metrics = PoolMetrics()
+    metrics.init_app(app, db)
+    with app.app_context():
+        with db.engines['replica'].connect():
+            stats = {stats['bind']: stats for stats in metrics.snapshot()}
+            assert stats['replica']['checked_out'] == 1
+            assert stats['default']['checked_out'] == 0
+        for engine in db.engines.values():
+            engine.dispose()
+    stats = {stats['bind']: stats for stats in metrics.snapshot()}
+    assert stats['replica']['checkouts'] == 1
+    assert stats['default']['checkouts'] == 0
@@ -0,0 +1,54 @@
+import os
+from prometheus_client import CollectorRegistry, Counter
+from prometheus_client.multiprocess import MultiProcessCollector
+from prometheus_client.parser import text_string_to_metric_families
+from src.test.fixtures.app_fixtures import sqlite_app_fixture
+
+def scrape(client) -> dict:
+    '''Samples served at /metrics, keyed by (name, sorted labels)'''
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(response.get_data(as_text=True))
+        for sample in family.samples
+    }
+
+def test_requests_counted_per_route(sqlite_app_fixture):
+    client = sqlite_app_fixture.test_client()
+    labels = (('method', 'GET'), ('namespace', 'post'), ('route', '/api/v1/post/<int:id>'), ('status', '404'))
+    before = scrape(client).get(('http_requests_total', labels), 0)
+    client.get('/api/v1/post/1')
+    client.get('/api/v1/post/2')
+    samples = scrape(client)
+    assert samples[('http_requests_total', labels)] == before + 2
+    assert samples[('http_request_duration_seconds_count', labels[:3])] >= 2
+    assert ('db_pool_checked_out', (('bind', 'default'),)) in samples
+    assert ('bcrypt_queue_depth', ()) in samples
+    assert ('cache_hits_total', ()) in samples
+
+def test_unmatched_routes_share_a_label(sqlite_app_fixture):
+    client = sqlite_app_fixture.test_client()
+    client.get('/nowhere/1')
+    client.get('/nowhere/2')
+    samples = scrape(client)
+    routes = {dict(labels).get('route') for name, labels in samples if name == 'http_requests_total'}
+    assert 'unmatched' in routes
+    assert not [route for route in routes if route and route.startswith('/nowhere')]
+
+def test_multiprocess_values_are_summed(monkeypatch, tmp_path):
+    # What gunicorn workers do: each forked process writes its own file
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    from prometheus_client import values
+    monkeypatch.setattr(values, 'ValueClass', values.get_value_class())
+    counter = Counter('worker_requests', 'Requests', registry=None)
+    for _ in range(3):
+        pid = os.fork()
+        if pid == 0:
+            counter.inc()
+            os._exit(0)
+        os.waitpid(pid, 0)
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, str(tmp_path))
+    assert registry.get_sample_value('worker_requests_total') == 3
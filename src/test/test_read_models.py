@@ -0,0 +1,43 @@
+import pytest
+
+from sqlalchemy import create_engine, text
+
+from extensions import db
+from src.main.constants import STATUS_ACTIVE, STATUS_LIVE
+from src.main.models.post_view import PostView
+from src.main.models.user_view import UserView
+
+@pytest.fixture
+def connection_fixture():
+    '''In-memory database holding one user and one post'''
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    with engine.connect() as connection:
+        connection.execute(text(
+            "INSERT INTO user (id, username, email, status, post_count, live_post_count, created_at, updated_at) "
+            "VALUES (5, 'mozart5', 'five@test.email', :status, 1, 1, '2024-04-10 10:10:35', '2024-04-10 10:10:35')"
+        ), {'status': STATUS_ACTIVE})
+        connection.execute(text(
+            'INSERT INTO post (id, title, author_id, content, excerpt, status, created_at, updated_at) '
+            "VALUES (7, 'Title', 5, 'Content', 'Content', :status, '2024-04-10 10:10:35', '2024-04-10 10:10:35')"
+        ), {'status': STATUS_LIVE})
+        yield connection
+
+def test_post_view_from_rows(connection_fixture):
+    posts = PostView.from_rows(connection_fixture.execute(PostView.select()))
+    assert posts[0].title == 'Title'
+    assert posts[0].created_at.year == 2024
+    assert not hasattr(posts[0], '__dict__')
+
+def test_post_view_selects_only_fields(connection_fixture):
+    posts = PostView.from_rows(connection_fixture.execute(PostView.select(('title',))))
+    assert posts[0].title == 'Title'
+    assert posts[0].content is None
+    # Cursors need these whatever the fields
+    assert posts[0].id == 7
+    assert posts[0].created_at is not None
+
+def test_user_view_from_rows(connection_fixture):
+    users = UserView.from_rows(connection_fixture.execute(UserView.select()))
+    assert users[0].username == 'mozart5'
+    assert users[0].live_post_count == 1
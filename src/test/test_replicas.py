@@ -0,0 +1,78 @@
+import pytest
+
+from flask import Flask, g
+from sqlalchemy import text
+
+from extensions import cache, db
+from src.main.constants import STATUS_ACTIVE, STATUS_LIVE
+from src.main.controllers.post_controller import get_post_by_id, get_post_view, get_posts
+from src.main.controllers.user_controller import get_user_by_id, get_user_view
+from src.main.models.principal import Principal
+from src.main.models.user import User
+from src.test.fixtures.user_fixtures import user_fixture
+
+INSERT_POST = text(
+    'INSERT INTO post (id, title, author_id, content, status, created_at, updated_at) '
+    "VALUES (1, :title, 5, 'content', :status, '2024-04-10 10:10:35', '2024-04-10 10:10:35')"
+)
+INSERT_USER = text(
+    'INSERT INTO user (id, username, email, status, created_at, updated_at) '
+    "VALUES (5, :username, 'five@test.email', :status, '2024-04-10 10:10:35', '2024-04-10 10:10:35')"
+)
+
+@pytest.fixture
+def replica_app_fixture(tmp_path):
+    '''App with two SQLite files standing in for the primary and a lagging replica'''
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI='sqlite:///{}'.format(tmp_path / 'primary.db'),
+        SQLALCHEMY_BINDS={'replica': 'sqlite:///{}'.format(tmp_path / 'replica.db')},
+        CACHE_TYPE='SimpleCache',
+        REPLICA_STICKY_SECONDS=5
+    )
+    db.init_app(app)
+    cache.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica'])
+        for bind, title in ((db.engines[None], 'Primary title'), (db.engines['replica'], 'Replica title')):
+            with bind.begin() as connection:
+                connection.execute(INSERT_POST, {'title': title, 'status': STATUS_LIVE})
+    # Each request then gets its own app context and session, as in production
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+def test_reads_go_to_replica(replica_app_fixture):
+    with replica_app_fixture.test_request_context():
+        posts, _ = get_posts()
+        assert posts[0].title == 'Replica title'
+    with replica_app_fixture.test_request_context():
+        assert get_post_view(1).title == 'Replica title'
+        assert get_post_by_id(1).title == 'Primary title'
+
+def test_user_reads_go_to_replica(replica_app_fixture):
+    with replica_app_fixture.app_context():
+        for bind, username in ((db.engines[None], 'primary'), (db.engines['replica'], 'replica')):
+            with bind.begin() as connection:
+                connection.execute(INSERT_USER, {'username': username, 'status': STATUS_ACTIVE})
+    with replica_app_fixture.test_request_context():
+        assert get_user_view(5).username == 'replica'
+        assert get_user_by_id(5).username == 'primary'
+
+def test_reads_stick_to_primary_after_own_write(replica_app_fixture, user_fixture):
+    principal = Principal.from_user(user_fixture)
+    with replica_app_fixture.test_request_context():
+        g.current_user = principal
+        db.session.add(User(id=6, username='writer', email='writer@test.email', status=STATUS_ACTIVE))
+        db.session.commit()
+        posts, _ = get_posts()
+        assert posts[0].title == 'Primary title'
+    with replica_app_fixture.test_request_context():
+        g.current_user = principal
+        posts, _ = get_posts()
+        assert posts[0].title == 'Primary title'
+    with replica_app_fixture.test_request_context():
+        posts, _ = get_posts()
+        assert posts[0].title == 'Replica title'
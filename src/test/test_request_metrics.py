@@ -0,0 +1,78 @@
+import logging
+import pytest
+from sqlalchemy import text
+from extensions import db, cache, request_metrics
+from src.main.constants import STATUS_LIVE
+from src.main.request_metrics import count_cache_lookup, memoized_lookup, normalize_statement, timed
+from src.test.fixtures.app_fixtures import sqlite_app_fixture
+
+@pytest.fixture
+def metrics_app_fixture(sqlite_app_fixture):
+    '''App with a probe endpoint running `n` queries and looking up a memoized value'''
+    app = sqlite_app_fixture
+
+    @cache.memoize(60)
+    def memoized_probe():
+        count_cache_lookup(False)
+        return 'cached'
+
+    def probe(n: int):
+        with timed('controller'):
+            for value in range(n):
+                db.session.execute(text('SELECT :value'), {'value': value})
+        # Bookkeeping reads, such as generations or replica stickiness, are not counted
+        cache.get('probe')
+        with memoized_lookup():
+            return memoized_probe()
+
+    app.add_url_rule('/probe/<int:n>', 'probe', probe)
+    return app
+
+def test_server_timing_header(metrics_app_fixture):
+    client = metrics_app_fixture.test_client()
+    response = client.get('/probe/2')
+    assert response.status_code == 200
+    header = response.headers['Server-Timing']
+    assert 'desc="2 queries"' in header
+    assert 'controller;dur=' in header
+    assert 'cache;desc="0 hits, 1 misses"' in header
+    assert 'total;dur=' in header
+    assert 'cache;desc="1 hits, 0 misses"' in client.get('/probe/2').headers['Server-Timing']
+
+def test_user_posts_cache_counted(metrics_app_fixture):
+    with metrics_app_fixture.app_context():
+        db.session.execute(text(
+            'INSERT INTO post (id, title, author_id, content, status, created_at, updated_at) '
+            "VALUES (1, 'Title', 5, 'content', :status, '2024-04-10 10:10:35', '2024-04-10 10:10:35')"
+        ), {'status': STATUS_LIVE})
+        db.session.commit()
+    client = metrics_app_fixture.test_client()
+    response = client.get('/api/v1/user/5/posts')
+    assert 'cache;desc="0 hits, 1 misses"' in response.headers['Server-Timing']
+    response = client.get('/api/v1/user/5/posts')
+    assert 'cache;desc="1 hits, 0 misses"' in response.headers['Server-Timing']
+
+def test_server_timing_disabled(metrics_app_fixture, monkeypatch):
+    monkeypatch.setattr(request_metrics, 'server_timing', False)
+    response = metrics_app_fixture.test_client().get('/probe/1')
+    assert 'Server-Timing' not in response.headers
+
+def test_repeated_queries_warn(metrics_app_fixture, caplog):
+    client = metrics_app_fixture.test_client()
+    with caplog.at_level(logging.INFO):
+        client.get('/probe/4')
+    assert not [record for record in caplog.records if record.levelno == logging.WARNING]
+    assert '"queries": 4' in caplog.text
+    caplog.clear()
+    with caplog.at_level(logging.INFO):
+        client.get('/probe/5')
+    warnings = [record.getMessage() for record in caplog.records if record.levelno == logging.WARNING]
+    assert warnings == ['Possible N+1 queries: GET /probe/5 ran 5 times: SELECT ?']
+
+def test_normalize_statement():
+    assert normalize_statement('SELECT post.id\nFROM post\nWHERE post.id IN (?, ?, ?)') == \
+        normalize_statement('SELECT post.id FROM post WHERE post.id IN (?)')
+
+def test_timed_outside_request():
+    with timed('controller'):
+        pass
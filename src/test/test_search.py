@@ -0,0 +1,96 @@
+import importlib.util
+import jwt
+import pytest
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import create_engine, text
+from extensions import db
+from src.main.constants import STATUS_ACTIVE
+from src.main.search import build_match_query
+from src.test.fixtures.app_fixtures import sqlite_app_fixture
+
+MIGRATION = 'migrations/versions/9e41c0d7a2f3_post_full_text_search.py'
+
+@pytest.fixture
+def search_client_fixture(sqlite_app_fixture):
+    '''Test client of an app holding one author, and the headers authenticating them'''
+    app = sqlite_app_fixture
+    with app.app_context():
+        db.session.execute(text(
+            'INSERT INTO user (id, public_id, username, email, admin, status, created_at, updated_at) '
+            "VALUES (5, 'author-id', 'author', 'author@blog.test', 0, :status, "
+            "'2024-04-10 10:10:35', '2024-04-10 10:10:35')"
+        ), {'status': STATUS_ACTIVE})
+        db.session.commit()
+    headers = {'Authorization': jwt.encode({'public_id': 'author-id'}, app.config['SECRET_KEY'], algorithm='HS256')}
+    return app.test_client(), headers
+
+def create_post(client, headers, title: str, content: str) -> int:
+    response = client.post('/api/v1/post/', json={'title': title, 'content': content}, headers=headers)
+    assert response.status_code == 201
+    return int(response.get_json()['id'])
+
+def search(client, query: str) -> list:
+    response = client.post('/api/v1/post/search', json={'query': query})
+    if response.status_code == 204:
+        return []
+    assert response.status_code == 200
+    return [int(post['id']) for post in response.get_json()['posts']]
+
+def test_build_match_query_quotes_terms():
+    assert build_match_query('exciting  blog') == '"exciting" "blog"'
+
+def test_build_match_query_escapes_syntax():
+    assert build_match_query('title:"x" OR -y') == '"title:""x""" "OR" "-y"'
+
+def test_build_match_query_empty():
+    assert build_match_query('   ') == ''
+
+def test_fts_table_created_with_post_table(sqlite_app_fixture):
+    with sqlite_app_fixture.app_context():
+        tables = db.session.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'")).scalars().all()
+    assert 'post_fts' in tables
+
+def test_migration_indexes_existing_posts(sqlite_app_fixture):
+    with sqlite_app_fixture.app_context():
+        db.session.execute(text('DROP TABLE post_fts'))
+        db.session.execute(text(
+            'INSERT INTO post (id, title, author_id, content, status, created_at, updated_at) '
+            "VALUES (1, 'Tuning a guitar', 5, 'content', 'live', '2024-04-10 10:10:35', '2024-04-10 10:10:35')"
+        ))
+        db.session.commit()
+        spec = importlib.util.spec_from_file_location('post_full_text_search', MIGRATION)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        with db.engine.begin() as connection, Operations.context(MigrationContext.configure(connection)):
+            migration.upgrade()
+        assert db.session.execute(text("SELECT rowid FROM post_fts WHERE post_fts MATCH 'guitar'")).scalars().all() == [1]
+
+def test_search_follows_create_edit_and_delete(search_client_fixture):
+    client, headers = search_client_fixture
+    post_id = create_post(client, headers, 'Tuning a guitar', 'Start from the low string.')
+    other_id = create_post(client, headers, 'Baking bread', 'Flour, water and salt.')
+    assert search(client, 'guitar') == [post_id]
+    assert search(client, 'flour') == [other_id]
+
+    response = client.put('/api/v1/post/{}'.format(post_id), json={'title': 'Tuning a violin', 'content': 'Start from the low string.'}, headers=headers)
+    assert response.status_code == 201
+    assert search(client, 'guitar') == []
+    assert search(client, 'violin') == [post_id]
+
+    response = client.patch('/api/v1/post/batch', json=[{'id': other_id, 'content': 'Rye and sourdough.'}], headers=headers)
+    assert response.status_code == 200
+    assert search(client, 'flour') == []
+    assert search(client, 'sourdough') == [other_id]
+
+    assert client.delete('/api/v1/post/{}'.format(post_id), headers=headers).status_code == 204
+    assert search(client, 'violin') == []
+    assert client.delete('/api/v1/post/batch', json={'ids': [other_id]}, headers=headers).status_code == 200
+    assert search(client, 'sourdough') == []
+
+def test_search_ranks_best_match_first(search_client_fixture):
+    client, headers = search_client_fixture
+    passing_id = create_post(client, headers, 'Weekend notes', 'Groceries, a long walk, and a guitar lesson at the end of a busy day.')
+    focused_id = create_post(client, headers, 'Guitar practice', 'Guitar scales, then guitar chords.')
+    assert search(client, 'guitar') == [focused_id, passing_id]
+    assert search(client, 'guitar walk') == [passing_id]
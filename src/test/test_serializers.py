@@ -0,0 +1,82 @@
+import orjson
+import pytest
+
+from datetime import datetime
+from flask_restx import Model, fields, marshal
+
+from src.main.views.schemas import post_page_response, post_response, user_response
+from src.main.views.serializers import DICT, ROW, compile_serializer, dumps, get_serializer
+from src.test.fixtures.post_fixtures import post_fixture
+from src.test.fixtures.user_fixtures import user_fixture
+
+mixed_model = Model('Mixed', {
+    'name': fields.String(default='anonymous'),
+    'count': fields.Integer(),
+    'ratio': fields.Float(),
+    'active': fields.Boolean(),
+    'seen_at': fields.DateTime(),
+    'tags': fields.List(fields.String),
+    'label': fields.String(attribute='title'),
+})
+
+def test_matches_marshal(post_fixture, user_fixture):
+    assert get_serializer(post_response)(post_fixture) == marshal(post_fixture, post_response)
+    assert get_serializer(user_response)(user_fixture) == marshal(user_fixture, user_response)
+
+def test_matches_marshal_with_mask(post_fixture):
+    serialize = get_serializer(post_response, ('title', 'id'))
+    assert serialize(post_fixture) == marshal(post_fixture, post_response, mask='{title,id}')
+    assert list(serialize(post_fixture)) == ['title', 'id']
+
+def test_page_keeps_fields_of_items(post_fixture):
+    page = {'posts': [post_fixture, post_fixture], 'next_cursor': 'abc'}
+    serialize = get_serializer(post_page_response, ('id',), DICT, items='posts')
+    assert serialize(page) == marshal(page, post_page_response, mask='{posts{id},next_cursor}')
+    assert dumps(serialize(page)) == b'{"posts":[{"id":"7"},{"id":"7"}],"next_cursor":"abc"}'
+
+@pytest.mark.parametrize('values', [
+    {'name': 'x', 'count': '3', 'ratio': 0.5, 'active': 1, 'seen_at': datetime(2024, 4, 10), 'tags': ['a'], 'title': 't'},
+    {},
+])
+def test_falls_back_to_restx_fields(values):
+    assert compile_serializer(mixed_model, source=DICT)(values) == marshal(values, mixed_model)
+
+def test_serializes_rows_by_position(post_fixture):
+    serialize = get_serializer(post_response, source=ROW)
+    row = tuple(getattr(post_fixture, name) for name in serialize.columns)
+    assert serialize(row) == marshal(post_fixture, post_response)
+    assert orjson.loads(dumps(serialize(row)))['title'] == post_fixture.title
+
+def test_rows_need_flat_models():
+    with pytest.raises(ValueError):
+        compile_serializer(post_page_response, source=ROW)
+
+@pytest.mark.parametrize('as_list', [False, True])
+def test_serialize_with_documented_like_marshal_with(as_list):
+    # Compared once parsed: swagger.json keeps the same content, not the same key order
+    from flask import Flask
+    from flask_restx import Api, Resource
+    from src.main.views.decorators import serialize_with
+
+    app = Flask(__name__)
+    api = Api(app)
+    api.models[post_response.name] = post_response
+
+    @api.route('/marshalled')
+    class Marshalled(Resource):
+        @api.marshal_with(post_response, as_list=as_list, description='Posts')
+        def get(self):
+            return []
+
+    @api.route('/serialized')
+    class Serialized(Resource):
+        @serialize_with(post_response, as_list=as_list, description='Posts')
+        def get(self):
+            return []
+
+    with app.test_request_context():
+        spec = orjson.loads(orjson.dumps(api.__schema__))
+    marshalled, serialized = spec['paths']['/marshalled']['get'], spec['paths']['/serialized']['get']
+    marshalled.pop('operationId')
+    serialized.pop('operationId')
+    assert serialized == marshalled
@@ -0,0 +1,83 @@
+import json
+import logging
+import pytest
+from sqlalchemy import text
+from extensions import db, slow_query_log
+from src.main.controllers import post_controller
+from src.main.constants import STATUS_LIVE
+from src.main.hashing import hash_password
+from src.main.models.user import User
+from src.test.fixtures.app_fixtures import app_config, sqlite_app_fixture
+
+pytestmark = app_config(SLOW_QUERY_SECONDS=0)
+
+@pytest.fixture
+def slow_app_fixture(sqlite_app_fixture):
+    '''App holding one post, logging every query as slow'''
+    app = sqlite_app_fixture
+    with app.app_context():
+        db.session.execute(text(
+            'INSERT INTO post (id, title, author_id, content, status, created_at, updated_at) '
+            "VALUES (1, 'Title', 5, 'content', :status, '2024-04-10 10:10:35', '2024-04-10 10:10:35')"
+        ), {'status': STATUS_LIVE})
+        db.session.commit()
+    return app
+
+def slow_queries(caplog) -> list:
+    return [
+        json.loads(record.getMessage()[len('slow query '):])
+        for record in caplog.records if record.getMessage().startswith('slow query ')
+    ]
+
+def test_slow_query_logged_with_plan(slow_app_fixture, caplog):
+    with slow_app_fixture.app_context(), caplog.at_level(logging.WARNING):
+        post = post_controller.get_post_view(1)
+    assert post.title == 'Title'
+    entry, = slow_queries(caplog)
+    assert entry['caller'].startswith('post_controller.get_post_view:')
+    assert entry['statement'].startswith('SELECT')
+    assert entry['parameters'] == {'rows': 1, 'types': ['str', 'int']}
+    assert any('post' in row for row in entry['plan'])
+
+def test_repeated_slow_query_logged_once(slow_app_fixture, caplog):
+    with slow_app_fixture.app_context(), caplog.at_level(logging.WARNING):
+        post_controller.get_post_view(1)
+        post_controller.get_post_view(2)
+        assert len(slow_queries(caplog)) == 1
+        # Once the interval is over
+        slow_query_log._logged.clear()
+        post_controller.get_post_view(1)
+    assert len(slow_queries(caplog)) == 2
+
+def test_writes_are_not_explained(slow_app_fixture, caplog):
+    with slow_app_fixture.app_context(), caplog.at_level(logging.WARNING):
+        db.session.execute(text("UPDATE post SET title = 'New' WHERE id = 1"))
+        db.session.commit()
+    entry, = [entry for entry in slow_queries(caplog) if entry['statement'].startswith('UPDATE')]
+    assert entry['caller'] is None
+    assert entry['plan'] is None
+
+def test_fast_queries_not_logged(slow_app_fixture, caplog, monkeypatch):
+    monkeypatch.setattr(slow_query_log, 'threshold', 60)
+    with slow_app_fixture.app_context(), caplog.at_level(logging.WARNING):
+        post_controller.get_post_view(1)
+    assert slow_queries(caplog) == []
+
+def test_parameter_values_not_logged(slow_app_fixture, caplog):
+    password_hash = hash_password('password', 4)
+    with slow_app_fixture.app_context(), caplog.at_level(logging.WARNING):
+        user = User(username='user', email='user@email.com', admin=False, status=STATUS_LIVE)
+        user._password_hash = password_hash
+        db.session.add(user)
+        db.session.commit()
+    entry, = [entry for entry in slow_queries(caplog) if entry['statement'].startswith('INSERT INTO user')]
+    assert 'str' in entry['parameters']['types']
+    assert password_hash not in caplog.text
+    assert 'user@email.com' not in caplog.text
+
+def test_streamed_queries_are_not_explained(slow_app_fixture, caplog):
+    with slow_app_fixture.app_context(), caplog.at_level(logging.WARNING):
+        rows = db.session.execute(text('SELECT id FROM post'), execution_options={'stream_results': True}).all()
+    assert rows == [(1,)]
+    entry, = slow_queries(caplog)
+    assert entry['plan'] is None
@@ -0,0 +1,30 @@
+from src.main.ttl_cache import TTLCache
+
+def test_ttl_cache_get_set():
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set('a', 1)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=30)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    assert len(cache) == 2
+
+def test_ttl_cache_expires(mocker):
+    cache = TTLCache(maxsize=2, ttl=30)
+    mocker.patch('src.main.ttl_cache.time.monotonic', return_value=100)
+    cache.set('a', 1)
+    mocker.patch('src.main.ttl_cache.time.monotonic', return_value=131)
+    assert cache.get('a') is None
+
+def test_ttl_cache_pop():
+    cache = TTLCache()
+    cache.set('a', 1)
+    assert cache.pop('a') == 1
+    assert cache.get('a') is None
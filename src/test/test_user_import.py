@@ -0,0 +1,51 @@
+import pytest
+
+from src.main.hashing import hash_password
+from src.main.user_import import UserImport, get_hash_pool, shutdown_hash_pool
+
+@pytest.fixture
+def user_import_fixture():
+    '''Importer that is never run against a database'''
+    return UserImport(log_rounds=4, chunk_size=2, workers=1)
+
+def test_check_row_valid(user_import_fixture):
+    row = {'username': ' user ', 'email': 'user@email.com', 'password': 'password'}
+    assert user_import_fixture.check_row(2, row)
+    assert row['username'] == 'user'
+    assert not user_import_fixture.errors
+
+def test_check_row_missing_value(user_import_fixture):
+    row = {'username': 'user', 'email': '', 'password': None}
+    assert not user_import_fixture.check_row(2, row)
+    assert user_import_fixture.errors == [{
+        'line': 2,
+        'username': 'user',
+        'email': '',
+        'errors': {'email': 'Missing required value.', 'password': 'Missing required value.'}
+    }]
+
+def test_check_row_duplicate_in_file(user_import_fixture):
+    assert user_import_fixture.check_row(2, {'username': 'user', 'email': 'a@email.com', 'password': 'p'})
+    assert not user_import_fixture.check_row(3, {'username': 'user', 'email': 'b@email.com', 'password': 'p'})
+    assert not user_import_fixture.check_row(4, {'username': 'other', 'email': 'a@email.com', 'password': 'p'})
+    assert [error['errors'] for error in user_import_fixture.errors] == [
+        {'username': 'Duplicate username in file.'},
+        {'email': 'Duplicate email in file.'}
+    ]
+
+def test_run_missing_columns(user_import_fixture):
+    with pytest.raises(ValueError) as e:
+        user_import_fixture.run(['username,email\n', 'user,user@email.com\n'])
+    assert str(e.value) == 'Missing CSV columns: password.'
+
+def test_imports_share_one_pool(user_import_fixture):
+    pool = get_hash_pool(1)
+    try:
+        # Every row rejected, so no database is needed
+        user_import_fixture.run(['username,email,password\n', 'user,,password\n'])
+        assert get_hash_pool(1) is pool
+        assert pool.submit(hash_password, 'password', 4).result().startswith('$2b$04$')
+    finally:
+        shutdown_hash_pool()
+    assert get_hash_pool(1) is not pool
+    shutdown_hash_pool()
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import text
+from extensions import db, cache
+from src.main.constants import STATUS_LIVE
+from src.main.controllers.post_controller import invalidate_user_posts, user_posts_generation_key
+from src.test.fixtures.app_fixtures import sqlite_app_fixture
+
+INSERT_POST = text(
+    'INSERT INTO post (id, title, author_id, content, status, created_at, updated_at) '
+    "VALUES (:id, :title, 5, 'content', :status, '2024-04-10 10:10:3' || :id, '2024-04-10 10:10:35')"
+)
+
+@pytest.fixture
+def cache_app_fixture(sqlite_app_fixture):
+    '''App holding one post of user 5'''
+    app = sqlite_app_fixture
+    with app.app_context():
+        db.session.execute(INSERT_POST, {'id': 1, 'title': 'First', 'status': STATUS_LIVE})
+        db.session.commit()
+    return app
+
+def titles(client) -> list:
+    response = client.get('/api/v1/user/5/posts')
+    assert response.status_code == 200
+    return [post['title'] for post in response.get_json()['posts']]
+
+def test_new_post_shown_after_generation_key_expired(cache_app_fixture):
+    client = cache_app_fixture.test_client()
+    with cache_app_fixture.app_context():
+        invalidate_user_posts(5)
+    # Memoized under the current generation
+    assert titles(client) == ['First']
+    with cache_app_fixture.app_context():
+        # As if the generation key had expired or been evicted
+        cache.delete(user_posts_generation_key(5))
+        db.session.execute(INSERT_POST, {'id': 2, 'title': 'Second', 'status': STATUS_LIVE})
+        db.session.commit()
+        invalidate_user_posts(5)
+    assert titles(client) == ['First', 'Second']
+
+def test_lost_generation_key_not_reused(cache_app_fixture):
+    client = cache_app_fixture.test_client()
+    assert titles(client) == ['First']
+    with cache_app_fixture.app_context():
+        cache.delete(user_posts_generation_key(5))
+        # A write whose invalidation was lost with the key
+        db.session.execute(INSERT_POST, {'id': 2, 'title': 'Second', 'status': STATUS_LIVE})
+        db.session.commit()
+    assert titles(client) == ['First', 'Second']
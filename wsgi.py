@@ -0,0 +1,4 @@
+from app import create_app
+
+# Entry point for the production server, see gunicorn.conf.py
+app = create_app()